@@ -1,51 +1,37 @@
-from datetime import time as _time
-
 from flask import Flask, session
 from flask_login import LoginManager
-from sqlalchemy import text
+from sqlalchemy import event
 
 from .models import db, User
 from config import Config
-from .i18n import TRANSLATIONS
-
-
-def _alter_tables():
-    """Raw SQL: add schedule_type column to existing business_hours table if missing."""
-    with db.engine.connect() as conn:
-        result = conn.execute(
-            text("SELECT name FROM sqlite_master WHERE type='table' AND name='business_hours'")
-        )
-        if result.fetchone():
-            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(business_hours)"))]
-            if 'schedule_type' not in cols:
-                conn.execute(text(
-                    "ALTER TABLE business_hours "
-                    "ADD COLUMN schedule_type VARCHAR(20) NOT NULL DEFAULT 'regular'"
-                ))
-                conn.commit()
-
-
-def _seed_schedule_rows():
-    """ORM: ensure all 14 hour rows and the active_schedule setting exist."""
-    from .models import BusinessHours, AppSetting
-
-    if not AppSetting.query.get('active_schedule'):
-        db.session.add(AppSetting(key='active_schedule', value='regular'))
-
-    # Ramadan defaults: Mon–Sat 9:00–15:00, Sunday closed
-    for day in range(7):
-        is_sunday = (day == 6)
-        for stype in ('regular', 'ramadan'):
-            if not BusinessHours.query.filter_by(day_of_week=day, schedule_type=stype).first():
-                close = _time(15, 0) if stype == 'ramadan' else _time(18, 0)
-                db.session.add(BusinessHours(
-                    day_of_week=day,
-                    schedule_type=stype,
-                    is_closed=is_sunday,
-                    open_time=None if is_sunday else _time(9, 0),
-                    close_time=None if is_sunday else close,
-                ))
-    db.session.commit()
+from .i18n import DEFAULT_LANG, compile_catalogs, missing_keys
+from .metrics import init_metrics
+
+
+def _engine_options(app):
+    """Pool sizing from config; in-memory SQLite uses a static pool that takes none."""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///') or ':memory:' in uri):
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('pool_size', app.config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', app.config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def _apply_sqlite_profile(app):
+    """Run the configured PRAGMA profile on every new SQLite connection."""
+    pragmas = app.config['SQLITE_PROFILES'].get(app.config['SQLITE_PROFILE'], {})
+    if db.engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(db.engine, 'connect')
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
 
 
 login_manager = LoginManager()
@@ -64,6 +50,7 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     # Initialize extensions
+    _engine_options(app)
     db.init_app(app)
     login_manager.init_app(app)
 
@@ -77,22 +64,53 @@ def create_app(config_class=Config):
     from .booking import bp as booking_bp
     app.register_blueprint(booking_bp)
 
-    from .admin import bp as admin_bp
-    app.register_blueprint(admin_bp)
+    if app.config['LAZY_ADMIN']:
+        from .admin import lazy_blueprint
+        app.register_blueprint(lazy_blueprint())
+    else:
+        from .admin import bp as admin_bp, routes  # noqa: F401  (routes adds the views)
+        app.register_blueprint(admin_bp)
+
+    # CLI commands
+    from .schema import explain_queries_command
+    app.cli.add_command(explain_queries_command)
+
+    from .stats import rebuild_stats_command
+    app.cli.add_command(rebuild_stats_command)
+
+    from .i18n import i18n_check_command
+    app.cli.add_command(i18n_check_command)
+
+    from .bulk import import_bookings_command, export_bookings_command
+    app.cli.add_command(import_bookings_command)
+    app.cli.add_command(export_bookings_command)
+
+    from .archive import archive_bookings_command
+    app.cli.add_command(archive_bookings_command)
+
+    from .migrations import migrate_schema_command
+    app.cli.add_command(migrate_schema_command)
+
+    # i18n: catalogs are compiled once (English fallback merged in) and each
+    # request just picks the prebuilt translator for its language
+    catalogs = compile_catalogs()
+    app.extensions['i18n'] = catalogs
+    for lang, keys in missing_keys().items():
+        app.logger.warning('i18n: %s is missing %d key(s): %s', lang, len(keys), ', '.join(keys))
 
-    # i18n context processor
     @app.context_processor
     def inject_i18n():
-        lang = session.get('lang', 'en')
-        strings = TRANSLATIONS.get(lang, TRANSLATIONS['en'])
-        def t(key):
-            return strings.get(key, TRANSLATIONS['en'].get(key, key))
-        return dict(t=t, lang=lang)
+        lang = session.get('lang', DEFAULT_LANG)
+        return dict(t=(catalogs.get(lang) or catalogs[DEFAULT_LANG]).t, lang=lang)
 
-    # Schema migrations + table creation + row seeding
+    # Schema migrations run once per deploy (gunicorn.conf.py, migrate-schema);
+    # with MIGRATE_ON_START a current database costs one version lookup
     with app.app_context():
-        _alter_tables()     # raw SQL: add missing columns before ORM is used
-        db.create_all()     # create any brand-new tables (e.g. AppSetting)
-        _seed_schedule_rows()  # ensure 14 hour rows + active_schedule setting
+        _apply_sqlite_profile(app)
+        init_metrics(app)
+        if app.config['MIGRATE_ON_START']:
+            from .migrations import upgrade
+            # Kept for migrate-schema, whose app is built (and migrated) first
+            app.extensions['migrations'] = upgrade()
 
     return app
@@ -1,5 +1,72 @@
-from flask import Blueprint
+"""
+Admin blueprint.
+
+Importing ``routes`` attaches the views to ``bp``. With LAZY_ADMIN,
+create_app() registers ``lazy_blueprint()`` instead. It has the same URLs
+and endpoint names, and each endpoint is bound to a stub. The first admin
+request imports ``routes`` and its dependencies (live.py, feeds, ...), so
+worker spawn and CLI commands skip them. Keep ``URLS`` in step with the
+``@bp.route`` lines; the first lazy load logs any difference.
+"""
+import importlib
+
+from flask import Blueprint, Flask, current_app
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-from . import routes  # noqa: F401, E402
+# (rule, endpoint, methods) for every view in routes.py
+URLS = [
+    ('/', 'dashboard', ['GET']),
+    ('/bookings', 'bookings', ['GET']),
+    ('/bookings/<int:booking_id>/status', 'update_booking_status', ['POST']),
+    ('/services', 'services', ['GET', 'POST']),
+    ('/staff', 'staff', ['GET', 'POST']),
+    ('/hours', 'hours', ['GET', 'POST']),
+    ('/calendar', 'calendar', ['GET']),
+    ('/calendar/events', 'calendar_events', ['GET']),
+    ('/calendar/stream', 'calendar_stream', ['GET']),
+    ('/hours/set-active', 'set_active_schedule', ['POST']),
+    ('/users', 'users', ['GET', 'POST']),
+    ('/metrics', 'metrics_page', ['GET']),
+    ('/metrics/prometheus', 'metrics_prometheus', ['GET']),
+]
+
+
+def _rules(blueprint):
+    """{(rule, endpoint, methods)} a blueprint registers, via a scratch app."""
+    scratch = Flask(__name__)
+    scratch.register_blueprint(blueprint)
+    return {
+        (r.rule, r.endpoint, tuple(sorted(r.methods - {'HEAD', 'OPTIONS'})))
+        for r in scratch.url_map.iter_rules() if r.endpoint.startswith('admin.')
+    }
+
+
+def _load_routes():
+    """Import routes.py on first use; warn once if URLS has drifted from it."""
+    routes = importlib.import_module(__name__ + '.routes')
+    if not getattr(routes, '_urls_checked', False):
+        routes._urls_checked = True
+        lazy = {(bp.url_prefix + rule, 'admin.' + endpoint, tuple(sorted(methods)))
+                for rule, endpoint, methods in URLS}
+        drift = lazy ^ _rules(bp)
+        if drift:
+            current_app.logger.warning('admin: URLS differs from routes.py: %s', sorted(drift))
+    return routes
+
+
+class _LazyView:
+    def __init__(self, endpoint):
+        self.__name__ = endpoint
+        self.endpoint = endpoint
+
+    def __call__(self, **kwargs):
+        return getattr(_load_routes(), self.endpoint)(**kwargs)
+
+
+def lazy_blueprint():
+    """An 'admin' blueprint whose views import routes.py on first request."""
+    lazy = Blueprint('admin', __name__, url_prefix='/admin')
+    for rule, endpoint, methods in URLS:
+        lazy.add_url_rule(rule, endpoint, _LazyView(endpoint), methods=methods)
+    return lazy
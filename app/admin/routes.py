@@ -1,11 +1,22 @@
+import hmac
+import os
 from datetime import datetime, time
 
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import current_app, render_template, redirect, url_for, flash, request, Response, abort
 from flask_login import login_required, current_user
 from functools import wraps
 
 from . import bp
+from .. import metrics, refdata, stats
 from ..models import db, User, Service, Staff, BusinessHours, Booking, AppSetting
+from ..pagination import keyset_page
+from ..readmodels import booking_rows, to_rows
+from ..changes import booking_changed
+from ..live import Broker, stream
+from ..feeds import (
+    STATUS_COLORS, DEFAULT_COLOR, window_criteria, wants_archive, event_rows, parse_fields, json_array_response,
+    feed_etag, conditional_response, parse_since, delta_response, sync_token,
+)
 
 
 def admin_required(f):
@@ -28,14 +39,13 @@ def dashboard():
     today_start = datetime.combine(today, time.min)
     today_end = datetime.combine(today, time.max)
 
-    today_bookings = Booking.query.filter(
-        Booking.start_time >= today_start,
-        Booking.start_time <= today_end,
-    ).order_by(Booking.start_time).all()
+    [today_query] = booking_rows(False, lambda m: m.start_time.between(today_start, today_end))
+    today_bookings = to_rows(today_query.order_by(Booking.start_time, Booking.id))
 
-    total_bookings = Booking.query.count()
-    pending_count = Booking.query.filter_by(status=Booking.STATUS_PENDING).count()
-    confirmed_count = Booking.query.filter_by(status=Booking.STATUS_CONFIRMED).count()
+    counts = stats.status_counts()
+    total_bookings = sum(counts.values())
+    pending_count = counts.get(Booking.STATUS_PENDING, 0)
+    confirmed_count = counts.get(Booking.STATUS_CONFIRMED, 0)
 
     return render_template(
         'admin/dashboard.html',
@@ -52,38 +62,45 @@ def dashboard():
 @bp.route('/bookings')
 @admin_required
 def bookings():
-    query = Booking.query
+    criteria = []
 
     filter_date = request.args.get('date', '')
     filter_staff = request.args.get('staff_id', type=int)
     filter_status = request.args.get('status', '')
+    history = bool(request.args.get('history'))
 
     if filter_date:
         try:
             d = datetime.strptime(filter_date, '%Y-%m-%d').date()
-            query = query.filter(
-                Booking.start_time >= datetime.combine(d, time.min),
-                Booking.start_time <= datetime.combine(d, time.max),
-            )
+            day_start, day_end = datetime.combine(d, time.min), datetime.combine(d, time.max)
+            criteria.append(lambda m: m.start_time.between(day_start, day_end))
         except ValueError:
             pass
 
     if filter_staff:
-        query = query.filter_by(staff_id=filter_staff)
+        criteria.append(lambda m: m.staff_id == filter_staff)
 
     if filter_status:
-        query = query.filter_by(status=filter_status)
-
-    bookings = query.order_by(Booking.start_time.desc()).all()
-    staff_list = Staff.query.all()
+        criteria.append(lambda m: m.status == filter_status)
+
+    page = keyset_page(
+        booking_rows(history, *criteria),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=current_app.config['BOOKINGS_PER_PAGE'],
+        with_total=bool(request.args.get('count')),
+    )
+    staff_list = refdata.staff()
 
     return render_template(
         'admin/bookings.html',
-        bookings=bookings,
+        bookings=to_rows(page.items),
+        page=page,
         staff_list=staff_list,
         filter_date=filter_date,
         filter_staff=filter_staff,
         filter_status=filter_status,
+        history=history,
     )
 
 
@@ -94,7 +111,9 @@ def update_booking_status(booking_id):
     new_status = request.form.get('status', '')
     valid = [Booking.STATUS_PENDING, Booking.STATUS_CONFIRMED, Booking.STATUS_CANCELLED]
     if new_status in valid:
+        old_status = booking.status
         booking.status = new_status
+        booking_changed(booking, old_status)
         db.session.commit()
         flash('Booking #{} status updated to {}.'.format(booking_id, new_status), 'success')
     else:
@@ -125,6 +144,7 @@ def services():
             else:
                 service = Service(name=name, description=description, duration_minutes=duration, price=price)
                 db.session.add(service)
+                refdata.bump_version()
                 db.session.commit()
                 flash('Service "{}" added.'.format(name), 'success')
 
@@ -132,6 +152,7 @@ def services():
             service_id = request.form.get('service_id', type=int)
             service = Service.query.get_or_404(service_id)
             db.session.delete(service)
+            refdata.bump_version()
             db.session.commit()
             flash('Service deleted.', 'info')
 
@@ -142,6 +163,7 @@ def services():
             service.description = request.form.get('description', service.description).strip()
             service.duration_minutes = request.form.get('duration_minutes', service.duration_minutes, type=int)
             service.price = request.form.get('price', service.price, type=float)
+            refdata.bump_version()
             db.session.commit()
             flash('Service updated.', 'success')
 
@@ -175,6 +197,7 @@ def staff():
             else:
                 member = Staff(name=name, email=email, specialty=specialty)
                 db.session.add(member)
+                refdata.bump_version()
                 db.session.commit()
                 flash('Staff member "{}" added.'.format(name), 'success')
 
@@ -182,6 +205,7 @@ def staff():
             staff_id = request.form.get('staff_id', type=int)
             member = Staff.query.get_or_404(staff_id)
             db.session.delete(member)
+            refdata.bump_version()
             db.session.commit()
             flash('Staff member deleted.', 'info')
 
@@ -191,6 +215,7 @@ def staff():
             member.name = request.form.get('name', member.name).strip()
             member.email = request.form.get('email', member.email).strip().lower()
             member.specialty = request.form.get('specialty', member.specialty).strip()
+            refdata.bump_version()
             db.session.commit()
             flash('Staff member updated.', 'success')
 
@@ -230,6 +255,7 @@ def hours():
                 except ValueError:
                     flash(f'Invalid time for {DAY_NAMES[day]}.', 'danger')
 
+        refdata.bump_version()
         db.session.commit()
         flash('Business hours updated.', 'success')
         return redirect(url_for('admin.hours', tab=schedule_type))
@@ -256,47 +282,72 @@ def hours():
 @bp.route('/calendar')
 @admin_required
 def calendar():
-    return render_template('admin/calendar.html')
+    return render_template('admin/calendar.html', sync_token=sync_token(),
+                           live_after=_live_broker().latest_id())
+
+
+def _event(r):
+    return {
+        'id':    r.id,
+        'title': f'{r.service} · {r.customer}',
+        'start': r.start_time.isoformat(),
+        'end':   r.end_time.isoformat(),
+        'color': STATUS_COLORS.get(r.status, DEFAULT_COLOR),
+        'extendedProps': {
+            'status':   r.status,
+            'customer': r.customer,
+            'service':  r.service,
+            'staff':    r.staff,
+            'notes':    r.notes or '',
+        },
+    }
 
 
 @bp.route('/calendar/events')
 @admin_required
 def calendar_events():
-    start_str = request.args.get('start', '')
-    end_str   = request.args.get('end', '')
+    criteria = window_criteria(request.args)
+    history = wants_archive(request.args)
+    fields = parse_fields(request.args)
+    since = parse_since(request.args)
 
-    query = Booking.query
-    if start_str and end_str:
-        try:
-            start_dt = datetime.fromisoformat(start_str[:19])
-            end_dt   = datetime.fromisoformat(end_str[:19])
-            query = query.filter(Booking.start_time >= start_dt,
-                                 Booking.start_time <= end_dt)
-        except ValueError:
-            pass
+    def build():
+        if since is not None:
+            return delta_response(since, criteria, _event, fields)
+        rows = event_rows(*criteria, include_archive=history)
+        return json_array_response((_event(r) for r in rows), fields)
+
+    return conditional_response(feed_etag(), build)
 
-    colors = {
-        Booking.STATUS_PENDING:   '#ffc107',
-        Booking.STATUS_CONFIRMED: '#198754',
-        Booking.STATUS_CANCELLED: '#dc3545',
-    }
-    events = []
-    for b in query.all():
-        events.append({
-            'id':    b.id,
-            'title': f'{b.service.name} · {b.user.name}',
-            'start': b.start_time.isoformat(),
-            'end':   b.end_time.isoformat(),
-            'color': colors.get(b.status, '#6c757d'),
-            'extendedProps': {
-                'status':   b.status,
-                'customer': b.user.name,
-                'service':  b.service.name,
-                'staff':    b.staff.name,
-                'notes':    b.notes or '',
-            },
-        })
-    return jsonify(events)
+
+def _live_broker():
+    broker = current_app.extensions.get('live')
+    if broker is None:
+        broker = current_app.extensions.setdefault('live', Broker(current_app._get_current_object(), _event))
+    return broker
+
+
+@bp.route('/calendar/stream')
+@admin_required
+def calendar_stream():
+    broker = _live_broker()
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('after')
+    # Subscribe before reading the backlog so nothing falls between the two;
+    # a change seen twice is harmless since the client upserts by id.
+    q = broker.subscribe()
+    if q is None:
+        # Every stream slot in this worker is taken; the page falls back to polling
+        return Response('Too many live calendars open.', status=503,
+                        headers={'Retry-After': str(current_app.config['LIVE_STREAM_SECONDS'])})
+    backlog = broker.messages_after(int(last_id)) if last_id and last_id.isdigit() else ()
+    # Plain generator: the request context (and its DB session) ends here,
+    # so an idle stream holds no connection from the pool; the backlog is
+    # read page by page as it is sent.
+    response = Response(stream(broker, q, backlog, current_app.config['LIVE_STREAM_SECONDS']),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @bp.route('/hours/set-active', methods=['POST'])
@@ -304,6 +355,7 @@ def calendar_events():
 def set_active_schedule():
     schedule = request.form.get('schedule', 'regular')
     if schedule in ('regular', 'ramadan'):
+        refdata.bump_version()
         AppSetting.set('active_schedule', schedule)
         flash('Active schedule switched.', 'success')
     return redirect(url_for('admin.hours', tab=schedule))
@@ -350,3 +402,28 @@ def users():
 
     all_users = User.query.order_by(User.name).all()
     return render_template('admin/users.html', users=all_users)
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+@bp.route('/metrics')
+@admin_required
+def metrics_page():
+    registry = metrics.registry()
+    return render_template('admin/metrics.html',
+                           rows=registry.snapshot() if registry else None,
+                           started=datetime.utcfromtimestamp(registry.started) if registry else None,
+                           worker=os.getpid())
+
+
+@bp.route('/metrics/prometheus')
+def metrics_prometheus():
+    registry = metrics.registry()
+    if registry is None:
+        abort(404)
+    token = current_app.config['METRICS_TOKEN']
+    auth = request.headers.get('Authorization', '')
+    if not (token and hmac.compare_digest(auth, 'Bearer ' + token)) and \
+            not (current_user.is_authenticated and current_user.is_admin):
+        abort(401)
+    return Response(registry.prometheus(), mimetype='text/plain; version=0.0.4')
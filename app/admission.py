@@ -0,0 +1,136 @@
+"""
+Atomic booking admission.
+
+The staff overlap check and the INSERT run under one write lock so two
+workers can never both pass the check for the same slot:
+
+* SQLite: the transaction is opened with ``BEGIN IMMEDIATE``, which takes the
+  database's RESERVED lock before the check. Other writers wait at most the
+  connection's busy timeout and then get a clean BUSY result. Threads of one
+  worker process first queue on an in-process lock, so only one of them at
+  a time waits in SQLite's busy handler, which polls with growing sleeps.
+  That queue is bounded too: a thread that cannot take the lock within
+  ``ADMISSION_LOCK_WAIT_SECONDS`` gets BUSY instead of waiting out every
+  thread ahead of it.
+* Other databases: the staff row is locked with ``SELECT ... FOR UPDATE``,
+  serialising admissions per staff member only.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+
+from .changes import booking_changed
+from .intervals import IntervalIndex
+from .models import db, Booking, Staff
+
+ADMITTED = 'admitted'
+CONFLICT = 'conflict'
+BUSY = 'busy'
+
+_sqlite_write_lock = threading.Lock()
+
+
+def _is_busy(exc):
+    """True if ``exc`` is SQLite lock contention (BUSY/LOCKED), not a real fault."""
+    code = getattr(exc.orig, 'sqlite_errorcode', None)
+    return code is not None and code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+@contextmanager
+def _write_lock():
+    """Serialise this process's SQLite writers; yields False if the lock was not free in time."""
+    if db.session.get_bind().dialect.name != 'sqlite':
+        yield True
+        return
+    if not _sqlite_write_lock.acquire(timeout=current_app.config['ADMISSION_LOCK_WAIT_SECONDS']):
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        _sqlite_write_lock.release()
+
+
+def _lock_staff(staff_id):
+    conn = db.session.connection()
+    if conn.dialect.name == 'sqlite':
+        if not conn.connection.dbapi_connection.in_transaction:
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+    else:
+        db.session.query(Staff.id).filter(Staff.id == staff_id).with_for_update().first()
+
+
+def has_conflict(staff_id, start_time, end_time):
+    return db.session.query(Booking.id).filter(
+        Booking.staff_id == staff_id,
+        Booking.status != Booking.STATUS_CANCELLED,
+        Booking.start_time < end_time,
+        Booking.end_time > start_time,
+    ).first() is not None
+
+
+def admit(booking):
+    """Insert ``booking`` if its staff member is free; return ADMITTED, CONFLICT or BUSY."""
+    with _write_lock() as locked:
+        if not locked:
+            return BUSY
+        try:
+            _lock_staff(booking.staff_id)
+            if has_conflict(booking.staff_id, booking.start_time, booking.end_time):
+                db.session.rollback()
+                return CONFLICT
+            db.session.add(booking)
+            booking_changed(booking)
+            db.session.commit()
+            return ADMITTED
+        except OperationalError as exc:
+            db.session.rollback()
+            if not _is_busy(exc):
+                raise
+            return BUSY
+
+
+def admit_many(bookings):
+    """
+    Insert every booking in ``bookings`` in one transaction, or none of them.
+
+    Returns ``(result, conflicts)`` where ``conflicts`` lists the positions of
+    bookings that overlap an existing booking or an earlier one in the batch.
+    Overlaps are found with one IntervalIndex load per call instead of a
+    probe per booking.
+    """
+    if not bookings:
+        return ADMITTED, []
+    with _write_lock() as locked:
+        if not locked:
+            return BUSY, []
+        try:
+            for staff_id in sorted({b.staff_id for b in bookings}):
+                _lock_staff(staff_id)
+            index = IntervalIndex.load(
+                {b.staff_id for b in bookings},
+                min(b.start_time for b in bookings),
+                max(b.end_time for b in bookings),
+            )
+            conflicts = []
+            for i, b in enumerate(bookings):
+                if index.overlaps(b.staff_id, b.start_time, b.end_time):
+                    conflicts.append(i)
+                else:
+                    index.add(b.staff_id, b.start_time, b.end_time)
+            if conflicts:
+                db.session.rollback()
+                return CONFLICT, conflicts
+            db.session.add_all(bookings)
+            for b in bookings:
+                booking_changed(b)
+            db.session.commit()
+            return ADMITTED, []
+        except OperationalError as exc:
+            db.session.rollback()
+            if not _is_busy(exc):
+                raise
+            return BUSY, []
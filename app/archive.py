@@ -0,0 +1,72 @@
+"""
+Booking archive: keeps the hot ``bookings`` table to recent and upcoming rows.
+
+Confirmed and cancelled bookings that ended more than ``ARCHIVE_AFTER_DAYS``
+ago are moved, ``ARCHIVE_BATCH_SIZE`` rows per transaction, into
+``bookings_archive``. Ids and columns are kept, so each write lock is short
+and a history view can merge both tables by ``(start_time, id)``. Pending
+bookings are never archived, because they still need an admin decision.
+Run it from cron:
+
+    flask --app run.py archive-bookings
+
+Materialized stats keep counting archived bookings (``stats.rebuild()``
+reads both tables). The booking version is bumped so calendar feeds
+revalidate. Read paths opt in: ``readmodels.booking_rows()`` for the list
+pages, ``feeds.event_rows()`` for the calendars.
+"""
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, literal, select
+
+from .changes import VERSION_KEY as BOOKINGS_VERSION_KEY
+from .models import db, AppSetting, Booking, BookingArchive
+
+ARCHIVABLE = (Booking.STATUS_CONFIRMED, Booking.STATUS_CANCELLED)
+
+
+def cutoff(now=None):
+    """Bookings ending before this are eligible for the archive."""
+    now = now or datetime.utcnow()
+    return now - timedelta(days=current_app.config['ARCHIVE_AFTER_DAYS'])
+
+
+def archive_before(before, batch_size=None):
+    """Move eligible bookings ending before ``before``; return how many moved."""
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    columns = [c.name for c in Booking.__table__.columns]
+    source = Booking.__table__
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            select(Booking.id)
+            .where(Booking.end_time < before, Booking.status.in_(ARCHIVABLE))
+            .order_by(Booking.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(insert(BookingArchive.__table__).from_select(
+            columns + ['archived_at'],
+            select(*[source.c[name] for name in columns], literal(datetime.utcnow()))
+            .where(source.c.id.in_(ids)),
+        ))
+        db.session.execute(delete(source).where(source.c.id.in_(ids)))
+        AppSetting.increment(BOOKINGS_VERSION_KEY)
+        db.session.commit()
+        moved += len(ids)
+    return moved
+
+
+@click.command('archive-bookings')
+@click.option('--days', type=int, help='Override ARCHIVE_AFTER_DAYS.')
+@click.option('--batch-size', type=int, help='Override ARCHIVE_BATCH_SIZE.')
+@with_appcontext
+def archive_bookings_command(days, batch_size):
+    """Move old confirmed/cancelled bookings into bookings_archive."""
+    before = datetime.utcnow() - timedelta(days=days) if days is not None else cutoff()
+    moved = archive_before(before, batch_size)
+    click.echo(f'Archived {moved} booking(s) that ended before {before:%Y-%m-%d %H:%M}.')
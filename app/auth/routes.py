@@ -1,8 +1,23 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import current_app, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 
 from . import bp
+from .. import passwords
 from ..models import db, User
+from ..throttle import Throttle
+
+
+def _throttles():
+    """Per-process (per-IP attempts, per-email failures) throttles."""
+    throttles = current_app.extensions.get('login_throttle')
+    if throttles is None:
+        config = current_app.config
+        window = config['LOGIN_WINDOW_SECONDS']
+        throttles = current_app.extensions.setdefault('login_throttle', (
+            Throttle(config['LOGIN_IP_LIMIT'], window),
+            Throttle(config['LOGIN_EMAIL_LIMIT'], window),
+        ))
+    return throttles
 
 
 @bp.route('/login', methods=['GET', 'POST'])
@@ -15,15 +30,31 @@ def login():
         password = request.form.get('password', '')
         remember = bool(request.form.get('remember'))
 
+        def _rerender(msg, status=200):
+            flash(msg, 'danger')
+            return render_template('auth/login.html', form_data={'email': email, 'remember': remember}), status
+
+        # Throttle before touching the database or the hash pool
+        by_ip, by_email = _throttles()
+        if not by_ip.hit(request.remote_addr or '') or by_email.blocked(email):
+            return _rerender('Too many login attempts. Please wait a few minutes and try again.', 429)
+
         user = User.query.filter_by(email=email).first()
-        if user and user.check_password(password):
+        try:
+            ok = passwords.verify(user, password)
+        except passwords.HashingBusy:
+            return _rerender('We are handling a lot of sign-ins right now. Please try again.', 503)
+
+        if ok:
+            by_email.reset(email)
+            db.session.commit()  # persists a rehash made with new parameters
             login_user(user, remember=remember)
             next_page = request.args.get('next')
             flash('Welcome back, {}!'.format(user.name), 'success')
             return redirect(next_page or url_for('main.index'))
         else:
-            flash('Invalid email or password.', 'danger')
-            return render_template('auth/login.html', form_data={'email': email, 'remember': remember})
+            by_email.hit(email)
+            return _rerender('Invalid email or password.')
 
     return render_template('auth/login.html')
 
@@ -42,17 +73,20 @@ def change_password():
         new = request.form.get('new_password', '')
         confirm = request.form.get('confirm_password', '')
 
-        if not current_user.check_password(current):
-            flash('Current password is incorrect.', 'danger')
-        elif len(new) < 6:
-            flash('New password must be at least 6 characters.', 'danger')
-        elif new != confirm:
-            flash('New passwords do not match.', 'danger')
-        else:
-            current_user.set_password(new)
-            db.session.commit()
-            flash('Password updated successfully.', 'success')
-            return redirect(url_for('main.index'))
+        try:
+            if not passwords.verify(current_user, current):
+                flash('Current password is incorrect.', 'danger')
+            elif len(new) < 6:
+                flash('New password must be at least 6 characters.', 'danger')
+            elif new != confirm:
+                flash('New passwords do not match.', 'danger')
+            else:
+                passwords.set_password(current_user, new)
+                db.session.commit()
+                flash('Password updated successfully.', 'success')
+                return redirect(url_for('main.index'))
+        except passwords.HashingBusy:
+            flash('We are handling a lot of sign-ins right now. Please try again.', 'danger')
 
     return render_template('auth/change_password.html')
 
@@ -0,0 +1,72 @@
+"""
+Free-slot availability engine.
+
+Builds every bookable slot for a service over a date range in one pass:
+the active schedule comes from the reference-data cache, all live bookings
+for the window are loaded into an IntervalIndex with a single query, and
+each staff member's busy intervals are then swept against the candidate slot
+starts of every open day.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from . import refdata
+from .intervals import IntervalIndex
+
+MAX_RANGE_DAYS = 31
+
+
+def _day_slots(open_dt, close_dt, duration, step, busy, not_before):
+    """Sweep candidate starts for one day against a StaffIntervals index."""
+    slots = []
+    starts, ends = busy.starts, busy.ends
+    n = len(starts)
+    i = bisect_right(ends, open_dt)
+    cursor = open_dt
+    while cursor + duration <= close_dt:
+        end = cursor + duration
+        while i < n and ends[i] <= cursor:
+            i += 1
+        if i < n and starts[i] < end:
+            # Jump to the first step boundary at or after the busy interval end
+            skip = ends[i] - open_dt
+            steps = -(-skip // step)
+            cursor = open_dt + steps * step
+            continue
+        if cursor > not_before:
+            slots.append(cursor)
+        cursor += step
+    return slots
+
+
+def free_slots(service, staff_ids, start_date, end_date, step_minutes=15, now=None):
+    """
+    Return bookable slots for ``service`` between ``start_date`` and ``end_date``
+    (inclusive) as an ordered list of ``(start_datetime, [staff_id, ...])``.
+    """
+    if now is None:
+        now = datetime.utcnow()
+    if not staff_ids or end_date < start_date:
+        return []
+
+    duration = timedelta(minutes=service.duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    schedule = refdata.schedule()
+
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    busy = IntervalIndex.load(staff_ids, window_start, window_end)
+
+    slots = {}
+    day = start_date
+    while day <= end_date:
+        bh = schedule.get(day.weekday())
+        if bh is not None and not bh.is_closed and bh.open_time and bh.close_time:
+            open_dt = datetime.combine(day, bh.open_time)
+            close_dt = datetime.combine(day, bh.close_time)
+            for staff_id in staff_ids:
+                for slot in _day_slots(open_dt, close_dt, duration, step, busy[staff_id], now):
+                    slots.setdefault(slot, []).append(staff_id)
+        day += timedelta(days=1)
+
+    return sorted(slots.items())
@@ -1,33 +1,51 @@
 from datetime import datetime, timedelta
 
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import current_app, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 
 from . import bp
-from ..models import db, Service, Staff, BusinessHours, Booking, AppSetting
+from .. import refdata
+from .. import series as recurring
+from ..models import db, Booking, BookingSeries
+from ..admission import admit, admit_many, BUSY, CONFLICT
+from ..pagination import keyset_page
+from ..readmodels import booking_rows, to_rows
+from ..changes import booking_changed
+from ..availability import free_slots, MAX_RANGE_DAYS
+from ..feeds import (
+    STATUS_COLORS, DEFAULT_COLOR, window_criteria, wants_archive, event_rows, parse_fields, json_array_response,
+    feed_etag, conditional_response, parse_since, delta_response,
+)
 
 
 @bp.route('/book', methods=['GET', 'POST'])
 @login_required
 def book():
-    services = Service.query.all()
-    staff_list = Staff.query.all()
+    services = refdata.services()
+    staff_list = refdata.staff()
 
     if request.method == 'POST':
         service_id = request.form.get('service_id', type=int)
         staff_id = request.form.get('staff_id', type=int)
         start_str = request.form.get('start_time', '')
         notes = request.form.get('notes', '').strip()
+        repeat = request.form.get('repeat', '')
+        repeat_count = request.form.get('repeat_count', type=int)
+        repeat_until = request.form.get('repeat_until', '')
+        skip_problems = bool(request.form.get('skip_problems'))
 
-        def _rerender(msg):
+        def _rerender(msg, occurrences=None):
             flash(msg, 'danger')
             form_data = {'service_id': service_id, 'staff_id': staff_id,
-                         'start_time': start_str, 'notes': notes}
+                         'start_time': start_str, 'notes': notes, 'repeat': repeat,
+                         'repeat_count': repeat_count, 'repeat_until': repeat_until,
+                         'skip_problems': skip_problems}
             return render_template('booking/book.html', services=services,
-                                   staff_list=staff_list, form_data=form_data)
+                                   staff_list=staff_list, form_data=form_data,
+                                   occurrences=occurrences)
 
-        service = Service.query.get(service_id)
-        staff = Staff.query.get(staff_id)
+        service = refdata.get_service(service_id)
+        staff = refdata.get_staff(staff_id)
 
         # Basic presence checks
         if not service or not staff:
@@ -39,6 +57,10 @@ def book():
         except (ValueError, TypeError):
             return _rerender('Invalid date/time format.')
 
+        if repeat:
+            return _book_series(service, staff, start_time, repeat, repeat_count,
+                                repeat_until, skip_problems, notes, _rerender)
+
         end_time = start_time + timedelta(minutes=service.duration_minutes)
 
         # 1. Must be in the future
@@ -46,9 +68,8 @@ def book():
             return _rerender('Booking must be scheduled in the future.')
 
         # 2. Check business hours (uses whichever schedule is currently active)
-        active_schedule = AppSetting.get('active_schedule', 'regular')
         day_of_week = start_time.weekday()  # 0=Mon, 6=Sun
-        bh = BusinessHours.query.filter_by(day_of_week=day_of_week, schedule_type=active_schedule).first()
+        bh = refdata.business_hours(day_of_week)
         if bh is None or bh.is_closed:
             return _rerender('We are closed on that day.')
 
@@ -59,22 +80,7 @@ def book():
                 )
             )
 
-        # 3. Check staff overlap
-        conflict = Booking.query.filter(
-            Booking.staff_id == staff_id,
-            Booking.status != Booking.STATUS_CANCELLED,
-            Booking.start_time < end_time,
-            Booking.end_time > start_time,
-        ).first()
-
-        if conflict:
-            return _rerender(
-                '{} is not available at that time. Please choose a different time or staff member.'.format(
-                    staff.name
-                )
-            )
-
-        # All checks passed — create booking
+        # 3. Check staff overlap and insert under one write lock
         booking = Booking(
             user_id=current_user.id,
             service_id=service_id,
@@ -84,8 +90,17 @@ def book():
             status=Booking.STATUS_PENDING,
             notes=notes,
         )
-        db.session.add(booking)
-        db.session.commit()
+        result = admit(booking)
+
+        if result == BUSY:
+            return _rerender('We are handling a lot of bookings right now. Please try again.')
+
+        if result == CONFLICT:
+            return _rerender(
+                '{} is not available at that time. Please choose a different time or staff member.'.format(
+                    staff.name
+                )
+            )
 
         flash('Booking confirmed for {} on {}!'.format(service.name, start_time.strftime('%b %d at %H:%M')), 'success')
         return redirect(url_for('booking.my_bookings'))
@@ -95,16 +110,103 @@ def book():
     return render_template('booking/book.html', services=services, staff_list=staff_list, form_data=form_data)
 
 
+def _book_series(service, staff, first, frequency, count, until_str, skip_problems, notes, rerender):
+    """Validate a whole recurring series in one pass and insert it in one transaction."""
+    until = None
+    if until_str:
+        try:
+            until = datetime.strptime(until_str, '%Y-%m-%d').date()
+        except ValueError:
+            return rerender('Invalid repeat end date.')
+    if count is not None and count < 1:
+        return rerender('Number of occurrences must be at least 1.')
+    try:
+        starts = recurring.occurrences(first, frequency, count=count, until=until)
+    except ValueError as exc:
+        return rerender(str(exc))
+
+    step = current_app.config['BOOKING_SLOT_MINUTES']
+    occurrences = recurring.check(service, staff.id, starts, step_minutes=step)
+    bookable = [occ for occ in occurrences if occ.problem is None]
+    problems = len(occurrences) - len(bookable)
+    if not bookable:
+        return rerender('None of the dates in this series can be booked.', occurrences)
+    if problems and not skip_problems:
+        return rerender('{} of {} dates in this series cannot be booked.'.format(
+            problems, len(occurrences)), occurrences)
+
+    booking_series = BookingSeries(user_id=current_user.id, frequency=frequency)
+    bookings = [
+        Booking(user_id=current_user.id, service_id=service.id, staff_id=staff.id,
+                start_time=occ.start, end_time=occ.end, status=Booking.STATUS_PENDING,
+                notes=notes, series=booking_series)
+        for occ in bookable
+    ]
+    result, _ = admit_many(bookings)
+
+    if result == BUSY:
+        return rerender('We are handling a lot of bookings right now. Please try again.')
+    if result == CONFLICT:
+        # Someone booked one of the slots since the check; show the fresh picture
+        return rerender('Some dates were just taken. Please review the series again.',
+                         recurring.check(service, staff.id, starts, step_minutes=step))
+
+    flash('{} {} bookings confirmed for {}, starting {}.'.format(
+        len(bookings), frequency, service.name, first.strftime('%b %d at %H:%M')), 'success')
+    if problems:
+        flash('{} dates were skipped.'.format(problems), 'warning')
+    return redirect(url_for('booking.my_bookings'))
+
+
+@bp.route('/availability')
+@login_required
+def availability():
+    service = refdata.get_service(request.args.get('service_id', type=int))
+    if service is None:
+        return jsonify({'error': 'Unknown service.'}), 400
+
+    staff_id = request.args.get('staff_id', type=int)
+    if staff_id:
+        if refdata.get_staff(staff_id) is None:
+            return jsonify({'error': 'Unknown staff member.'}), 400
+        staff_ids = [staff_id]
+    else:
+        staff_ids = [member.id for member in refdata.staff()]
+
+    try:
+        start_date = datetime.strptime(request.args.get('start', ''), '%Y-%m-%d').date()
+    except ValueError:
+        start_date = datetime.utcnow().date()
+    days = request.args.get('days', 1, type=int)
+    days = max(1, min(days, MAX_RANGE_DAYS))
+    end_date = start_date + timedelta(days=days - 1)
+
+    slots = free_slots(service, staff_ids, start_date, end_date,
+                       step_minutes=current_app.config['BOOKING_SLOT_MINUTES'])
+    return jsonify({
+        'service_id': service.id,
+        'duration_minutes': service.duration_minutes,
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'slots': [
+            {'start': slot.strftime('%Y-%m-%dT%H:%M'), 'staff_ids': ids}
+            for slot, ids in slots
+        ],
+    })
+
+
 @bp.route('/my-bookings')
 @login_required
 def my_bookings():
-    bookings = (
-        Booking.query
-        .filter_by(user_id=current_user.id)
-        .order_by(Booking.start_time.desc())
-        .all()
+    history = bool(request.args.get('history'))
+    page = keyset_page(
+        booking_rows(history, lambda m: m.user_id == current_user.id),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=current_app.config['BOOKINGS_PER_PAGE'],
     )
-    return render_template('booking/my_bookings.html', bookings=bookings, now=datetime.utcnow())
+    return render_template('booking/my_bookings.html', bookings=to_rows(page.items), page=page,
+                           history=history, now=datetime.utcnow())
 
 
 @bp.route('/calendar')
@@ -113,43 +215,38 @@ def calendar():
     return render_template('booking/calendar.html')
 
 
+def _event(r):
+    return {
+        'id':    r.id,
+        'title': f'{r.service} · {r.staff}',
+        'start': r.start_time.isoformat(),
+        'end':   r.end_time.isoformat(),
+        'color': STATUS_COLORS.get(r.status, DEFAULT_COLOR),
+        'extendedProps': {
+            'status':  r.status,
+            'service': r.service,
+            'staff':   r.staff,
+            'notes':   r.notes or '',
+        },
+    }
+
+
 @bp.route('/calendar/events')
 @login_required
 def calendar_events():
-    start_str = request.args.get('start', '')
-    end_str   = request.args.get('end', '')
+    user_id = current_user.id
+    criteria = [lambda m: m.user_id == user_id] + window_criteria(request.args)
+    history = wants_archive(request.args)
+    fields = parse_fields(request.args)
+    since = parse_since(request.args)
 
-    query = Booking.query.filter_by(user_id=current_user.id)
-    if start_str and end_str:
-        try:
-            start_dt = datetime.fromisoformat(start_str[:19])
-            end_dt   = datetime.fromisoformat(end_str[:19])
-            query = query.filter(Booking.start_time >= start_dt,
-                                 Booking.start_time <= end_dt)
-        except ValueError:
-            pass
+    def build():
+        if since is not None:
+            return delta_response(since, criteria, _event, fields)
+        rows = event_rows(*criteria, include_archive=history)
+        return json_array_response((_event(r) for r in rows), fields)
 
-    colors = {
-        Booking.STATUS_PENDING:   '#ffc107',
-        Booking.STATUS_CONFIRMED: '#198754',
-        Booking.STATUS_CANCELLED: '#dc3545',
-    }
-    events = []
-    for b in query.all():
-        events.append({
-            'id':    b.id,
-            'title': f'{b.service.name} · {b.staff.name}',
-            'start': b.start_time.isoformat(),
-            'end':   b.end_time.isoformat(),
-            'color': colors.get(b.status, '#6c757d'),
-            'extendedProps': {
-                'status':  b.status,
-                'service': b.service.name,
-                'staff':   b.staff.name,
-                'notes':   b.notes or '',
-            },
-        })
-    return jsonify(events)
+    return conditional_response(feed_etag(current_user.id), build)
 
 
 @bp.route('/cancel/<int:booking_id>', methods=['POST'])
@@ -169,7 +266,9 @@ def cancel(booking_id):
         flash('You cannot cancel a past booking.', 'warning')
         return redirect(url_for('booking.my_bookings'))
 
+    old_status = booking.status
     booking.status = Booking.STATUS_CANCELLED
+    booking_changed(booking, old_status)
     db.session.commit()
     flash('Your booking has been cancelled.', 'info')
     return redirect(url_for('booking.my_bookings'))
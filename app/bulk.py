@@ -0,0 +1,336 @@
+"""
+Bulk booking import/export for branch migrations and backfills.
+
+Both directions use one flat record per booking. Customers, services and
+staff are referenced by natural keys (email, service name, staff email), so
+an export from one branch imports cleanly into another:
+
+    flask --app run.py export-bookings bookings.csv
+    flask --app run.py import-bookings bookings.csv --validate
+
+The import streams the file in chunks. Foreign keys are resolved through
+in-memory maps loaded once per table. Missing customers, services and staff
+are created on first sight (customers get an unusable password until an
+admin resets it). Bookings go in with executemany INSERTs, inside a single
+transaction. ``--validate`` first makes a sorted sweep per staff member over
+the file's intervals and the bookings already stored, and refuses overlapping
+imports before anything is written. Materialized stats are rebuilt and the
+booking/refdata versions bumped in the same transaction. Live calendar
+listeners are not sent one event per imported row; open calendars pick the
+rows up through the version bump.
+"""
+import csv
+import json
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert, literal_column, select, union_all
+
+from . import refdata, stats
+from .changes import VERSION_KEY as BOOKINGS_VERSION_KEY
+from .intervals import IntervalIndex
+from .models import db, User, Service, Staff, Booking, BookingArchive, AppSetting
+
+FIELDS = (
+    'customer_email', 'customer_name', 'service', 'staff_email', 'staff_name',
+    'start_time', 'end_time', 'status', 'notes', 'created_at',
+)
+STATUSES = (Booking.STATUS_PENDING, Booking.STATUS_CONFIRMED, Booking.STATUS_CANCELLED)
+DEFAULT_CHUNK_SIZE = 5000
+EXPORT_CHUNK_ROWS = 2000
+UNUSABLE_PASSWORD = '!'
+
+
+class RecordError(click.ClickException):
+    """A bad input record; reported with its line/record number."""
+
+    def __init__(self, lineno, message):
+        super().__init__(f'record {lineno}: {message}')
+
+
+# ── Reading ──────────────────────────────────────────────────────────────────
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_records(stream, fmt):
+    """Yield ``(record_number, dict)`` from a CSV (with header) or JSONL stream."""
+    if fmt == 'jsonl':
+        for n, line in enumerate(stream, 1):
+            if line.strip():
+                yield n, json.loads(line)
+    else:
+        yield from enumerate(csv.DictReader(stream), 1)
+
+
+def _parse_dt(lineno, value, field):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise RecordError(lineno, f'bad {field} {value!r}')
+
+
+class _Resolver:
+    """Natural-key -> id maps; missing rows are created one flush per chunk."""
+
+    def __init__(self):
+        self.users = dict(db.session.execute(select(User.email, User.id)).all())
+        self.staff = dict(db.session.execute(select(Staff.email, Staff.id)).all())
+        self.services = {}
+        self.durations = {}
+        for sid, name, minutes in db.session.execute(select(Service.id, Service.name, Service.duration_minutes)):
+            self.services[name] = sid
+            self.durations[sid] = minutes
+        self.created = {'users': 0, 'services': 0, 'staff': 0}
+
+    def prepare(self, chunk):
+        """Create every customer, service and staff member ``chunk`` mentions but the maps lack."""
+        users, staff, services = {}, {}, {}
+        for lineno, rec in chunk:
+            email = _key(rec, 'customer_email').lower()
+            if email and email not in self.users and email not in users:
+                users[email] = User(name=rec.get('customer_name') or email, email=email,
+                                    password_hash=UNUSABLE_PASSWORD)
+            email = _key(rec, 'staff_email').lower()
+            if email and email not in self.staff and email not in staff:
+                staff[email] = Staff(name=rec.get('staff_name') or email, email=email)
+            name = _key(rec, 'service')
+            if name and name not in self.services and name not in services:
+                if not rec.get('end_time') or not rec.get('start_time'):
+                    raise RecordError(lineno, 'start_time and end_time are required for a new service')
+                minutes = (_parse_dt(lineno, rec['end_time'], 'end_time')
+                           - _parse_dt(lineno, rec['start_time'], 'start_time')).total_seconds() // 60
+                services[name] = Service(name=name, duration_minutes=int(minutes), price=0.0)
+        if not (users or staff or services):
+            return
+        db.session.add_all([*users.values(), *staff.values(), *services.values()])
+        db.session.flush()
+        self.users.update((k, u.id) for k, u in users.items())
+        self.staff.update((k, m.id) for k, m in staff.items())
+        for name, service in services.items():
+            self.services[name] = service.id
+            self.durations[service.id] = service.duration_minutes
+        self.created['users'] += len(users)
+        self.created['staff'] += len(staff)
+        self.created['services'] += len(services)
+
+
+def _key(rec, field):
+    return (rec.get(field) or '').strip()
+
+
+def _to_row(lineno, rec, resolver, now):
+    for field in ('customer_email', 'service', 'staff_email', 'start_time'):
+        if not rec.get(field):
+            raise RecordError(lineno, f'missing {field}')
+    start = _parse_dt(lineno, rec['start_time'], 'start_time')
+    status = rec.get('status') or Booking.STATUS_CONFIRMED
+    if status not in STATUSES:
+        raise RecordError(lineno, f'unknown status {status!r}')
+    service_id = resolver.services[_key(rec, 'service')]
+    if rec.get('end_time'):
+        end = _parse_dt(lineno, rec['end_time'], 'end_time')
+    else:
+        end = start + timedelta(minutes=resolver.durations[service_id])
+    if end <= start:
+        raise RecordError(lineno, 'end_time must be after start_time')
+
+    return {
+        'user_id': resolver.users[_key(rec, 'customer_email').lower()],
+        'service_id': service_id,
+        'staff_id': resolver.staff[_key(rec, 'staff_email').lower()],
+        'start_time': start,
+        'end_time': end,
+        'status': status,
+        'notes': rec.get('notes') or '',
+        'created_at': _parse_dt(lineno, rec['created_at'], 'created_at') if rec.get('created_at') else now,
+        'updated_at': now,
+    }
+
+
+# ── Overlap validation ───────────────────────────────────────────────────────
+
+def find_overlaps(records):
+    """
+    Sorted sweep over ``records`` (an iterable of ``(lineno, rec)``); return
+    ``[(lineno, message)]`` for live bookings that overlap another record or
+    a booking already stored for the same staff member.
+    """
+    durations = {
+        name: timedelta(minutes=minutes)
+        for name, minutes in db.session.execute(select(Service.name, Service.duration_minutes))
+    }
+    intervals = {}
+    open_ended = []
+    for lineno, rec in records:
+        if (rec.get('status') or Booking.STATUS_CONFIRMED) == Booking.STATUS_CANCELLED:
+            continue
+        if not rec.get('start_time'):
+            continue  # reported by the import itself
+        start = _parse_dt(lineno, rec['start_time'], 'start_time')
+        staff = _key(rec, 'staff_email').lower()
+        service = _key(rec, 'service')
+        if rec.get('end_time'):
+            end = _parse_dt(lineno, rec['end_time'], 'end_time')
+            # A new service takes its duration from the first record that has one
+            durations.setdefault(service, end - start)
+            intervals.setdefault(staff, []).append((start, end, lineno))
+        else:
+            open_ended.append((staff, service, start, lineno))
+    for staff, service, start, lineno in open_ended:
+        if service in durations:
+            intervals.setdefault(staff, []).append((start, start + durations[service], lineno))
+
+    staff_ids = dict(db.session.execute(select(Staff.email, Staff.id)).all())
+    problems = []
+    for email, ivs in intervals.items():
+        ivs.sort()
+        existing = None
+        if email in staff_ids:
+            existing = IntervalIndex.load([staff_ids[email]], ivs[0][0], max(e for _, e, _ in ivs))
+            existing = existing[staff_ids[email]]
+        prev_end, prev_line = None, None
+        for start, end, lineno in ivs:
+            if prev_end is not None and start < prev_end:
+                problems.append((lineno, f'overlaps record {prev_line} for {email}'))
+            elif existing is not None and existing.overlaps(start, end):
+                problems.append((lineno, f'overlaps an existing booking for {email}'))
+            if prev_end is None or end > prev_end:
+                prev_end, prev_line = end, lineno
+    return sorted(problems)
+
+
+# ── Import / export ──────────────────────────────────────────────────────────
+
+def import_bookings(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Insert ``records`` (``(lineno, rec)`` pairs) in chunks; commit once. Return counters."""
+    resolver = _Resolver()
+    now = datetime.utcnow()
+    records = iter(records)
+    total = 0
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            resolver.prepare(chunk)
+            rows = [_to_row(lineno, rec, resolver, now) for lineno, rec in chunk]
+            # Core executemany on the table: skips the ORM bulk-insert bookkeeping
+            db.session.connection().execute(insert(Booking.__table__), rows)
+            total += len(rows)
+        if resolver.created['services'] or resolver.created['staff']:
+            refdata.bump_version()
+        AppSetting.increment(BOOKINGS_VERSION_KEY)
+        stats.rebuild()  # commits the whole import
+    except Exception:
+        db.session.rollback()
+        raise
+    return dict(resolver.created, bookings=total)
+
+
+def _export_select(model, start, end):
+    stmt = (
+        select(*(
+            column.label(name) for column, name in zip(
+                (User.email, User.name, Service.name, Staff.email, Staff.name, model.start_time,
+                 model.end_time, model.status, model.notes, model.created_at, model.id),
+                FIELDS + ('booking_id',),
+            )
+        ))
+        .join(User, model.user_id == User.id)
+        .join(Service, model.service_id == Service.id)
+        .join(Staff, model.staff_id == Staff.id)
+    )
+    if start is not None:
+        stmt = stmt.where(model.start_time >= start)
+    if end is not None:
+        stmt = stmt.where(model.start_time < end)
+    return stmt
+
+
+def export_rows(start=None, end=None):
+    """Yield one flat record dict per booking, live and archived, ordered by start time."""
+    stmt = union_all(
+        *(_export_select(model, start, end) for model in (Booking, BookingArchive))
+    ).order_by(literal_column('start_time'), literal_column('booking_id'))
+    for row in db.session.execute(stmt, execution_options={'yield_per': EXPORT_CHUNK_ROWS}):
+        rec = dict(zip(FIELDS, row))
+        for field in ('start_time', 'end_time', 'created_at'):
+            rec[field] = rec[field].isoformat()
+        rec['notes'] = rec['notes'] or ''
+        yield rec
+
+
+def write_records(rows, stream, fmt):
+    """Write record dicts to ``stream`` as CSV (with header) or JSONL; return the count."""
+    n = 0
+    if fmt == 'jsonl':
+        for n, rec in enumerate(rows, 1):
+            stream.write(json.dumps(rec, ensure_ascii=False))
+            stream.write('\n')
+    else:
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for n, rec in enumerate(rows, 1):
+            writer.writerow(rec)
+    return n
+
+
+def _open(path, mode):
+    if path == '-':
+        return sys.stdin if mode == 'r' else sys.stdout
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+@click.command('import-bookings')
+@click.argument('path')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Default: from the file extension.')
+@click.option('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, show_default=True)
+@click.option('--validate/--no-validate', default=False, help='Refuse the import if any live bookings overlap.')
+@with_appcontext
+def import_bookings_command(path, fmt, chunk_size, validate):
+    """Import bookings (and their customers, services, staff) from CSV or JSONL."""
+    fmt = _detect_format(path, fmt)
+    if validate:
+        if path == '-':
+            raise click.UsageError('--validate needs a file path; stdin cannot be read twice.')
+        with _open(path, 'r') as stream:
+            problems = find_overlaps(read_records(stream, fmt))
+        if problems:
+            for lineno, message in problems[:50]:
+                click.echo(f'record {lineno}: {message}', err=True)
+            raise click.ClickException(f'{len(problems)} overlapping booking(s); nothing imported')
+
+    stream = _open(path, 'r')
+    try:
+        counts = import_bookings(read_records(stream, fmt), chunk_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    click.echo('Imported {bookings} booking(s); created {users} customer(s), '
+               '{services} service(s), {staff} staff.'.format(**counts))
+
+
+@click.command('export-bookings')
+@click.argument('path', default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Default: from the file extension.')
+@click.option('--start', type=click.DateTime(['%Y-%m-%d']), help='Only bookings starting on/after this date.')
+@click.option('--end', type=click.DateTime(['%Y-%m-%d']), help='Only bookings starting before this date.')
+@with_appcontext
+def export_bookings_command(path, fmt, start, end):
+    """Stream bookings to CSV or JSONL (``-`` for stdout)."""
+    fmt = _detect_format(path, fmt)
+    stream = _open(path, 'w')
+    try:
+        n = write_records(export_rows(start, end), stream, fmt)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    if path != '-':
+        click.echo(f'Exported {n} booking(s) to {path}.')
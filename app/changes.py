@@ -0,0 +1,26 @@
+"""
+Single hook for booking mutations.
+
+Every path that inserts a booking or changes its status calls
+``booking_changed()`` before committing. It keeps the materialized counters
+in step (app.stats), bumps the shared ``bookings_version`` row that the
+calendar feeds use as their HTTP validator, and appends to the
+``booking_changes`` log that app.live streams to open admin calendars.
+"""
+from . import stats
+from .models import db, AppSetting, BookingChange
+
+VERSION_KEY = 'bookings_version'
+
+
+def booking_changed(booking, old_status=None):
+    """Record a new booking (``old_status`` None) or a status change."""
+    stats.record(booking, old_status)
+    AppSetting.increment(VERSION_KEY)
+    db.session.flush()  # assigns booking.id for new bookings
+    db.session.add(BookingChange(booking_id=booking.id, status=booking.status, old_status=old_status))
+
+
+def version():
+    """Current bookings version, shared by all workers."""
+    return AppSetting.get(VERSION_KEY, '0')
@@ -0,0 +1,186 @@
+"""
+Shared plumbing for the FullCalendar event feeds (admin and customer).
+
+Rows come from one column-projected SELECT joined to services, staff and
+users, so a feed costs a single statement however many bookings it covers
+and no ORM objects are hydrated into the session. The rows are fetched in
+``yield_per`` batches and written out as a chunked JSON array, so memory
+stays flat whatever the requested window.
+
+Feeds are also conditional: the ETag is derived from the shared bookings
+and reference-data versions plus the request itself (events carry service
+and staff names, so renaming either must change it too). A FullCalendar
+refetch with a matching ``If-None-Match`` is answered 304 without touching
+the bookings table.
+
+Long-open calendars can sync incrementally: ``?since=<token>`` returns only
+bookings whose ``updated_at`` moved past the token, cancelled ones flagged
+as tombstones, plus the token to use next time.
+
+Feeds read the live ``bookings`` table. A window that starts before the
+archive cutoff (app.archive), or a request with ``?history=1``, also reads
+``bookings_archive`` through a UNION ALL of the same projection, so paging
+a calendar back into archived months still shows them. Criteria are
+callables taking the model, as in app.readmodels, so one filter serves
+both tables.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify, request, stream_with_context
+from sqlalchemy import select, union_all
+
+from . import archive, changes, refdata
+from .models import db, Booking, BookingArchive, Service, Staff, User
+
+STATUS_COLORS = {
+    Booking.STATUS_PENDING:   '#ffc107',
+    Booking.STATUS_CONFIRMED: '#198754',
+    Booking.STATUS_CANCELLED: '#dc3545',
+}
+DEFAULT_COLOR = '#6c757d'
+
+# Rows fetched from the cursor / events written per response chunk
+STREAM_CHUNK_ROWS = 500
+EVENT_FIELDS = ('id', 'title', 'start', 'end', 'color', 'extendedProps')
+
+# Sync tokens lag the clock slightly so a write committed just after the
+# query cannot fall between two polls; clients upsert by id, so repeats are harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _window(args):
+    """FullCalendar's ``start``/``end`` query args as datetimes, or None."""
+    start_str = args.get('start', '')
+    end_str   = args.get('end', '')
+    if start_str and end_str:
+        try:
+            return datetime.fromisoformat(start_str[:19]), datetime.fromisoformat(end_str[:19])
+        except ValueError:
+            return None
+    return None
+
+
+def window_criteria(args):
+    """Translate FullCalendar's ``start``/``end`` query args into filter criteria."""
+    window = _window(args)
+    if window is None:
+        return []
+    start_dt, end_dt = window
+    return [lambda m: m.start_time >= start_dt, lambda m: m.start_time <= end_dt]
+
+
+def wants_archive(args):
+    """True for ``?history=1`` or a window starting before the archive cutoff."""
+    if args.get('history'):
+        return True
+    window = _window(args)
+    return window is not None and window[0] < archive.cutoff()
+
+
+def sync_token(now=None):
+    """Token a client should pass as ``?since=`` on its next delta request."""
+    return ((now or datetime.utcnow()) - SYNC_OVERLAP).isoformat()
+
+
+def parse_since(args):
+    """Return the ``?since=`` token as a datetime, or None for a full fetch."""
+    raw = args.get('since', '')
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        return None
+
+
+def _event_select(model, criteria):
+    return (
+        select(
+            model.id.label('id'),
+            model.start_time.label('start_time'),
+            model.end_time.label('end_time'),
+            model.status.label('status'),
+            model.notes.label('notes'),
+            Service.name.label('service'),
+            Staff.name.label('staff'),
+            User.name.label('customer'),
+        )
+        .join(Service, model.service_id == Service.id)
+        .join(Staff, model.staff_id == Staff.id)
+        .join(User, model.user_id == User.id)
+        .where(*(c(model) for c in criteria))
+    )
+
+
+def event_rows(*criteria, include_archive=False):
+    """
+    Yield flat booking rows (with service/staff/customer names) matching
+    ``criteria``, from the live table and, with ``include_archive``, the
+    archive too (still one statement).
+    """
+    if include_archive:
+        stmt = union_all(*(_event_select(model, criteria) for model in (Booking, BookingArchive)))
+    else:
+        stmt = _event_select(Booking, criteria)
+    return db.session.execute(stmt, execution_options={'yield_per': STREAM_CHUNK_ROWS})
+
+
+def parse_fields(args):
+    """Return the ``?fields=id,start,...`` projection, or None for full events."""
+    raw = args.get('fields', '')
+    fields = [f for f in (part.strip() for part in raw.split(',')) if f in EVENT_FIELDS]
+    return fields or None
+
+
+def feed_etag(*scope):
+    """Validator for this feed request: bookings + refdata versions + endpoint/query + ``scope``."""
+    versions = (changes.version(), refdata.snapshot().version)
+    raw = '|'.join(str(part) for part in versions + (request.full_path,) + scope)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def conditional_response(etag, build):
+    """Return 304 if the client already holds ``etag``, else ``build()``; tag either way."""
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def delta_response(since, criteria, to_event, fields=None):
+    """JSON object with events changed after ``since``, tombstone ids and the next token."""
+    token = sync_token()
+    events, tombstones = [], []
+    for row in event_rows(lambda m: m.updated_at > since, *criteria):
+        event = to_event(row)
+        events.append({k: event[k] for k in fields} if fields else event)
+        if row.status == Booking.STATUS_CANCELLED:
+            tombstones.append(row.id)
+    return jsonify(events=events, tombstones=tombstones, since=token)
+
+
+def json_array_response(events, fields=None):
+    """Stream an iterable of event dicts as a JSON array, one chunk per batch."""
+    def generate():
+        yield '['
+        batch = []
+        sep = ''
+        for event in events:
+            if fields:
+                event = {k: event[k] for k in fields}
+            batch.append(json.dumps(event, separators=(',', ':')))
+            if len(batch) >= STREAM_CHUNK_ROWS:
+                yield sep + ','.join(batch)
+                batch = []
+                sep = ','
+        if batch:
+            yield sep + ','.join(batch)
+        yield ']'
+
+    return current_app.response_class(stream_with_context(generate()),
+                                      mimetype='application/json')
@@ -1,3 +1,9 @@
+import re
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
 TRANSLATIONS = {
     'en': {
         # Navbar
@@ -63,6 +69,41 @@ TRANSLATIONS = {
         'book_notes_optional': 'optional',
         'book_notes_placeholder': 'Any special requests or notes\u2026',
         'book_submit': 'Confirm Booking',
+        'book_slots_label': 'Available times',
+        'book_slots_hint': 'Pick a service and a date to see free slots.',
+        'book_slots_none': 'No free slots on this day.',
+        'book_repeat_label': 'Repeat',
+        'book_repeat_none': 'Does not repeat',
+        'book_repeat_weekly': 'Every week',
+        'book_repeat_biweekly': 'Every two weeks',
+        'book_repeat_monthly': 'Every month',
+        'book_repeat_count': 'Number of bookings',
+        'book_repeat_until': 'Or until',
+        'book_repeat_hint': 'The series stops at whichever comes first (max 52 bookings).',
+        'book_repeat_skip': 'Book the available dates and skip the rest',
+        'series_report_title': 'Series check',
+        'series_problem_past': 'this time has already passed',
+        'series_problem_closed': 'we are closed that day',
+        'series_problem_hours': 'outside business hours',
+        'series_problem_conflict': 'the staff member is already booked',
+        'series_suggestions': 'Try:',
+        'history_include': 'Include archived',
+        'history_hide': 'Hide archived',
+        'history_archived': 'Archived',
+        'nav_metrics': 'Metrics',
+        'metrics_title': 'Performance Metrics',
+        'metrics_off': 'Instrumentation is off. Set METRICS_ENABLED=1 to record request and SQL metrics.',
+        'metrics_worker': 'Worker process',
+        'metrics_since': 'since',
+        'metrics_empty': 'No requests recorded yet.',
+        'metrics_col_endpoint': 'Endpoint',
+        'metrics_col_requests': 'Requests',
+        'metrics_col_errors': 'Errors',
+        'metrics_col_p50': 'p50 (ms)',
+        'metrics_col_p95': 'p95 (ms)',
+        'metrics_col_queries': 'Queries (avg / max)',
+        'metrics_col_sql': 'SQL time (ms, avg)',
+        'metrics_slowest': 'Slowest statements',
         # Booking \u2013 My Bookings
         'mybookings_title': 'My Bookings',
         'mybookings_new': 'New Booking',
@@ -185,6 +226,10 @@ TRANSLATIONS = {
         'chpwd_submit': 'Update Password',
         # Common
         'min': 'min',
+        'page_newer': 'Newer',
+        'page_older': 'Older',
+        'page_of': 'of',
+        'page_show_total': 'Show total',
     },
     'ar': {
         # Navbar
@@ -250,6 +295,41 @@ TRANSLATIONS = {
         'book_notes_optional': '\u0627\u062e\u062a\u064a\u0627\u0631\u064a',
         'book_notes_placeholder': '\u0623\u064a \u0637\u0644\u0628\u0627\u062a \u062e\u0627\u0635\u0629 \u0623\u0648 \u0645\u0644\u0627\u062d\u0638\u0627\u062a...',
         'book_submit': '\u062a\u0623\u0643\u064a\u062f \u0627\u0644\u062d\u062c\u0632',
+        'book_slots_label': '\u0627\u0644\u0623\u0648\u0642\u0627\u062a \u0627\u0644\u0645\u062a\u0627\u062d\u0629',
+        'book_slots_hint': '\u0627\u062e\u062a\u0631 \u062e\u062f\u0645\u0629 \u0648\u062a\u0627\u0631\u064a\u062e\u064b\u0627 \u0644\u0639\u0631\u0636 \u0627\u0644\u0623\u0648\u0642\u0627\u062a \u0627\u0644\u0645\u062a\u0627\u062d\u0629.',
+        'book_slots_none': '\u0644\u0627 \u062a\u0648\u062c\u062f \u0623\u0648\u0642\u0627\u062a \u0645\u062a\u0627\u062d\u0629 \u0641\u064a \u0647\u0630\u0627 \u0627\u0644\u064a\u0648\u0645.',
+        'book_repeat_label': '\u0627\u0644\u062a\u0643\u0631\u0627\u0631',
+        'book_repeat_none': '\u0628\u062f\u0648\u0646 \u062a\u0643\u0631\u0627\u0631',
+        'book_repeat_weekly': '\u0643\u0644 \u0623\u0633\u0628\u0648\u0639',
+        'book_repeat_biweekly': '\u0643\u0644 \u0623\u0633\u0628\u0648\u0639\u064a\u0646',
+        'book_repeat_monthly': '\u0643\u0644 \u0634\u0647\u0631',
+        'book_repeat_count': '\u0639\u062f\u062f \u0627\u0644\u062d\u062c\u0648\u0632\u0627\u062a',
+        'book_repeat_until': '\u0623\u0648 \u062d\u062a\u0649',
+        'book_repeat_hint': '\u062a\u0646\u062a\u0647\u064a \u0627\u0644\u0633\u0644\u0633\u0644\u0629 \u0639\u0646\u062f \u0623\u064a\u0647\u0645\u0627 \u064a\u0623\u062a\u064a \u0623\u0648\u0644\u0627\u064b (\u0665\u0662 \u062d\u062c\u0632\u064b\u0627 \u0643\u062d\u062f \u0623\u0642\u0635\u0649).',
+        'book_repeat_skip': '\u0627\u062d\u062c\u0632 \u0627\u0644\u062a\u0648\u0627\u0631\u064a\u062e \u0627\u0644\u0645\u062a\u0627\u062d\u0629 \u0648\u062a\u062e\u0637\u064e\u0651 \u0627\u0644\u0628\u0627\u0642\u064a',
+        'series_report_title': '\u0641\u062d\u0635 \u0627\u0644\u0633\u0644\u0633\u0644\u0629',
+        'series_problem_past': '\u0647\u0630\u0627 \u0627\u0644\u0648\u0642\u062a \u0642\u062f \u0645\u0636\u0649',
+        'series_problem_closed': '\u0646\u062d\u0646 \u0645\u063a\u0644\u0642\u0648\u0646 \u0641\u064a \u0630\u0644\u0643 \u0627\u0644\u064a\u0648\u0645',
+        'series_problem_hours': '\u062e\u0627\u0631\u062c \u0633\u0627\u0639\u0627\u062a \u0627\u0644\u0639\u0645\u0644',
+        'series_problem_conflict': '\u0639\u0636\u0648 \u0627\u0644\u0641\u0631\u064a\u0642 \u0645\u062d\u062c\u0648\u0632 \u0628\u0627\u0644\u0641\u0639\u0644',
+        'series_suggestions': '\u062c\u0631\u0651\u0628:',
+        'history_include': '\u062a\u0636\u0645\u064a\u0646 \u0627\u0644\u0645\u0624\u0631\u0634\u0641\u0629',
+        'history_hide': '\u0625\u062e\u0641\u0627\u0621 \u0627\u0644\u0645\u0624\u0631\u0634\u0641\u0629',
+        'history_archived': '\u0645\u0624\u0631\u0634\u0641',
+        'nav_metrics': '\u0627\u0644\u0645\u0642\u0627\u064a\u064a\u0633',
+        'metrics_title': '\u0645\u0642\u0627\u064a\u064a\u0633 \u0627\u0644\u0623\u062f\u0627\u0621',
+        'metrics_off': '\u0627\u0644\u0642\u064a\u0627\u0633 \u0645\u062a\u0648\u0642\u0641. \u0627\u0636\u0628\u0637 METRICS_ENABLED=1 \u0644\u062a\u0633\u062c\u064a\u0644 \u0645\u0642\u0627\u064a\u064a\u0633 \u0627\u0644\u0637\u0644\u0628\u0627\u062a \u0648 SQL.',
+        'metrics_worker': '\u0639\u0645\u0644\u064a\u0629 \u0627\u0644\u062e\u0627\u062f\u0645',
+        'metrics_since': '\u0645\u0646\u0630',
+        'metrics_empty': '\u0644\u0645 \u062a\u064f\u0633\u062c\u064e\u0651\u0644 \u0623\u064a \u0637\u0644\u0628\u0627\u062a \u0628\u0639\u062f.',
+        'metrics_col_endpoint': '\u0627\u0644\u0645\u0633\u0627\u0631',
+        'metrics_col_requests': '\u0627\u0644\u0637\u0644\u0628\u0627\u062a',
+        'metrics_col_errors': '\u0627\u0644\u0623\u062e\u0637\u0627\u0621',
+        'metrics_col_p50': 'p50 (\u0645\u0644\u0644\u064a \u062b\u0627\u0646\u064a\u0629)',
+        'metrics_col_p95': 'p95 (\u0645\u0644\u0644\u064a \u062b\u0627\u0646\u064a\u0629)',
+        'metrics_col_queries': '\u0627\u0644\u0627\u0633\u062a\u0639\u0644\u0627\u0645\u0627\u062a (\u0645\u062a\u0648\u0633\u0637 / \u0623\u0642\u0635\u0649)',
+        'metrics_col_sql': '\u0632\u0645\u0646 SQL (\u0645\u0644\u0644\u064a \u062b\u0627\u0646\u064a\u0629\u060c \u0645\u062a\u0648\u0633\u0637)',
+        'metrics_slowest': '\u0623\u0628\u0637\u0623 \u0627\u0644\u0627\u0633\u062a\u0639\u0644\u0627\u0645\u0627\u062a',
         # Booking \u2013 My Bookings
         'mybookings_title': '\u062d\u062c\u0648\u0632\u0627\u062a\u064a',
         'mybookings_new': '\u062d\u062c\u0632 \u062c\u062f\u064a\u062f',
@@ -372,5 +452,77 @@ TRANSLATIONS = {
         'chpwd_submit': '\u062a\u062d\u062f\u064a\u062b \u0643\u0644\u0645\u0629 \u0627\u0644\u0645\u0631\u0648\u0631',
         # Common
         'min': '\u062f\u0642\u064a\u0642\u0629',
+        'page_newer': '\u0627\u0644\u0623\u062d\u062f\u062b',
+        'page_older': '\u0627\u0644\u0623\u0642\u062f\u0645',
+        'page_of': '\u0645\u0646',
+        'page_show_total': '\u0639\u0631\u0636 \u0627\u0644\u0625\u062c\u0645\u0627\u0644\u064a',
     },
 }
+
+DEFAULT_LANG = 'en'
+
+
+class Translator(dict):
+    """
+    Compiled catalog for one language, with the English fallback pre-merged.
+
+    ``t`` is the bound C-level ``__getitem__``, so a template lookup is one
+    dict probe; unknown keys fall through ``__missing__`` and render as-is.
+    """
+
+    def __init__(self, lang, strings):
+        super().__init__(strings)
+        self.lang = lang
+        self.t = self.__getitem__
+
+    def __missing__(self, key):
+        return key
+
+
+def compile_catalogs(translations=TRANSLATIONS, default=DEFAULT_LANG):
+    """Return {lang: Translator}, each catalog being ``default`` overlaid with ``lang``."""
+    base = translations[default]
+    return {lang: Translator(lang, {**base, **strings}) for lang, strings in translations.items()}
+
+
+def missing_keys(translations=TRANSLATIONS, default=DEFAULT_LANG):
+    """Return {lang: [keys present in ``default`` but not in lang]} for incomplete languages."""
+    base = translations[default]
+    report = {}
+    for lang, strings in translations.items():
+        missing = sorted(set(base) - set(strings))
+        if missing:
+            report[lang] = missing
+    return report
+
+
+_TEMPLATE_KEY = re.compile(r"""\bt\(\s*['"]([A-Za-z0-9_]+)['"]\s*\)""")
+
+
+def template_keys():
+    """Return {key: [template, ...]} for every ``t('key')`` call in the app's templates."""
+    env = current_app.jinja_env
+    used = {}
+    for name in env.list_templates(extensions=['html']):
+        source = env.loader.get_source(env, name)[0]
+        for key in _TEMPLATE_KEY.findall(source):
+            used.setdefault(key, []).append(name)
+    return used
+
+
+@click.command('i18n-check')
+@with_appcontext
+def i18n_check_command():
+    """Report keys missing per language and keys templates use but no catalog defines."""
+    problems = 0
+    for lang, keys in missing_keys().items():
+        problems += len(keys)
+        click.echo(f'{lang}: missing {len(keys)} key(s): ' + ', '.join(keys))
+    base = TRANSLATIONS[DEFAULT_LANG]
+    for key, templates in sorted(template_keys().items()):
+        if key not in base:
+            problems += 1
+            click.echo(f'undefined key {key!r} used in ' + ', '.join(sorted(set(templates))))
+    if problems:
+        raise click.ClickException(f'{problems} translation problem(s) found')
+    click.echo('All translation keys present.')
@@ -0,0 +1,95 @@
+"""
+In-memory per-staff interval index for bulk conflict detection.
+
+Busy intervals for a window are loaded with one query and kept per staff
+member as merged, sorted ``starts``/``ends`` arrays, so each overlap check
+is a binary search instead of a SQL round trip. Results are only valid for
+times inside the window the index was loaded for.
+"""
+from bisect import bisect_left, bisect_right
+
+from .models import db, Booking
+
+
+class StaffIntervals:
+    """Disjoint, sorted busy intervals for one staff member."""
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def overlaps(self, start, end):
+        """True if ``[start, end)`` intersects a busy interval. O(log n)."""
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def add(self, start, end):
+        """Mark ``[start, end)`` busy, merging with any intervals it touches."""
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def next_free(self, start, duration, not_after=None):
+        """Earliest time >= ``start`` with ``duration`` free, or None past ``not_after``."""
+        i = bisect_right(self.ends, start)
+        while i < len(self.starts) and self.starts[i] < start + duration:
+            start = self.ends[i]
+            i += 1
+        if not_after is not None and start + duration > not_after:
+            return None
+        return start
+
+
+class IntervalIndex:
+    """Busy intervals for several staff members over one time window."""
+
+    def __init__(self, staff_ids=()):
+        self._staff = {staff_id: StaffIntervals() for staff_id in staff_ids}
+
+    @classmethod
+    def load(cls, staff_ids, window_start, window_end):
+        """Build the index from live (non-cancelled) bookings in one query."""
+        rows = (
+            db.session.query(Booking.staff_id, Booking.start_time, Booking.end_time)
+            .filter(
+                Booking.staff_id.in_(staff_ids),
+                Booking.status != Booking.STATUS_CANCELLED,
+                Booking.start_time < window_end,
+                Booking.end_time > window_start,
+            )
+            .order_by(Booking.staff_id, Booking.start_time)
+        )
+        grouped = {staff_id: [] for staff_id in staff_ids}
+        for staff_id, start, end in rows:
+            grouped[staff_id].append((start, end))
+        index = cls()
+        index._staff = {staff_id: StaffIntervals(ivs) for staff_id, ivs in grouped.items()}
+        return index
+
+    def __getitem__(self, staff_id):
+        return self._staff.setdefault(staff_id, StaffIntervals())
+
+    def overlaps(self, staff_id, start, end):
+        return self[staff_id].overlaps(start, end)
+
+    def add(self, staff_id, start, end):
+        self[staff_id].add(start, end)
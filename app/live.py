@@ -0,0 +1,196 @@
+"""
+Live booking updates over Server-Sent Events.
+
+Fan-out goes through the ``booking_changes`` table rather than an external
+broker: each worker process runs one watcher thread that tails the log every
+``LIVE_POLL_SECONDS``, loads the changed bookings as calendar events with a
+single query, and hands them to every listener queue in that process. A
+worker therefore costs one small SELECT per poll however many admins are
+connected, and changes made by any worker reach all of them.
+
+Streams end after ``LIVE_STREAM_SECONDS``, or as soon as a listener falls
+``LISTENER_QUEUE_SIZE`` messages behind; EventSource reconnects on its own and
+sends ``Last-Event-ID`` so anything written in between is replayed, a page of
+``FETCH_LIMIT`` changes at a time.
+
+Each open stream holds a worker thread, so a worker accepts at most
+``LIVE_MAX_LISTENERS`` of them. Past that the stream is refused with 503
+and the calendar page falls back to ``?since=`` polling, leaving the other
+threads to the rest of the site.
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .models import db, BookingChange
+
+LISTENER_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15
+PRUNE_EVERY_POLLS = 600
+FETCH_LIMIT = 1000
+
+
+class Listener(queue.Queue):
+    """A listener's message queue; ``closed`` is set when the broker drops it."""
+
+    def __init__(self):
+        super().__init__(maxsize=LISTENER_QUEUE_SIZE)
+        self.closed = threading.Event()
+
+
+class Broker:
+    """Per-process fan-out from the change log to listener queues."""
+
+    def __init__(self, app, to_event):
+        self.app = app
+        self.to_event = to_event
+        self.poll_seconds = app.config['LIVE_POLL_SECONDS']
+        self.retention = timedelta(hours=app.config['LIVE_RETENTION_HOURS'])
+        self.max_listeners = app.config['LIVE_MAX_LISTENERS']
+        self._listeners = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_id = None
+
+    # ── listeners ────────────────────────────────────────────────────────────
+
+    def subscribe(self):
+        """Register a listener queue, or return None at ``max_listeners``; call inside an app context."""
+        q = Listener()
+        with self._lock:
+            if len(self._listeners) >= self.max_listeners:
+                return None
+            self._listeners.add(q)
+            if self._thread is None or not self._thread.is_alive():
+                # Start from now: streams opened earlier have ended, and new ones
+                # replay what they missed from Last-Event-ID
+                self._last_id = self.latest_id()
+                self._thread = threading.Thread(target=self._run, name='live-broker', daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._listeners.discard(q)
+
+    def listener_count(self):
+        return len(self._listeners)
+
+    def _publish(self, messages):
+        with self._lock:
+            listeners = list(self._listeners)
+        for q in listeners:
+            for message in messages:
+                try:
+                    q.put_nowait(message)
+                except queue.Full:
+                    # A stalled client: drop it and end its stream, EventSource
+                    # will reconnect and replay
+                    self.unsubscribe(q)
+                    q.closed.set()
+                    break
+
+    # ── change log ───────────────────────────────────────────────────────────
+
+    def _fetch(self, last_id, limit):
+        """``([(change_id, event_dict)], highest change id read)`` for changes after ``last_id``."""
+        from .feeds import event_rows
+
+        changes = (
+            db.session.query(BookingChange.id, BookingChange.booking_id)
+            .filter(BookingChange.id > last_id)
+            .order_by(BookingChange.id)
+            .limit(limit)
+            .all()
+        )
+        if not changes:
+            return [], last_id
+        booking_ids = {c.booking_id for c in changes}
+        rows = {r.id: r for r in event_rows(lambda m: m.id.in_(booking_ids))}
+        # Changes whose booking was since archived or deleted have no row and are skipped
+        messages = [
+            (change_id, self.to_event(rows[booking_id]))
+            for change_id, booking_id in changes
+            if booking_id in rows
+        ]
+        return messages, changes[-1].id
+
+    def messages_after(self, last_id, limit=FETCH_LIMIT):
+        """Yield (change_id, event_dict) for every change after ``last_id``, ``limit`` per query.
+
+        Each page is read in its own app context, so the generator can be
+        consumed from a streamed response.
+        """
+        while True:
+            with self.app.app_context():
+                try:
+                    messages, read_to = self._fetch(last_id, limit)
+                finally:
+                    db.session.remove()
+            if read_to == last_id:
+                return
+            yield from messages
+            last_id = read_to
+
+    def latest_id(self):
+        return db.session.query(db.func.max(BookingChange.id)).scalar() or 0
+
+    def _run(self):
+        polls = 0
+        while True:
+            with self.app.app_context():
+                try:
+                    # Advance past every change read, delivered or not, so a run of
+                    # changes to deleted bookings is not fetched again each poll
+                    messages, self._last_id = self._fetch(self._last_id, FETCH_LIMIT)
+                    if messages:
+                        self._publish(messages)
+                    polls += 1
+                    if polls % PRUNE_EVERY_POLLS == 0:
+                        BookingChange.query.filter(
+                            BookingChange.created_at < datetime.utcnow() - self.retention
+                        ).delete()
+                        db.session.commit()
+                except Exception:
+                    self.app.logger.exception('live broker poll failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            with self._lock:
+                if not self._listeners:
+                    self._thread = None
+                    return
+            time.sleep(self.poll_seconds)
+
+
+def format_sse(change_id, event):
+    return f'id: {change_id}\nevent: booking\ndata: {json.dumps(event, separators=(",", ":"))}\n\n'
+
+
+def stream(broker, q, backlog, duration):
+    """Generator of SSE text: ``backlog`` first, then messages from ``q`` until ``duration``.
+
+    Ends early once the broker has dropped ``q``; the client resumes from the
+    last id it received.
+    """
+    deadline = time.monotonic() + duration
+    try:
+        yield 'retry: 3000\n\n'
+        for change_id, event in backlog:
+            if q.closed.is_set():
+                return
+            yield format_sse(change_id, event)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or q.closed.is_set():
+                return
+            try:
+                change_id, event = q.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_sse(change_id, event)
+    finally:
+        broker.unsubscribe(q)
@@ -1,7 +1,8 @@
 from flask import render_template, redirect, request, session, url_for
 
 from . import bp
-from ..models import Service
+from .. import refdata
+from ..pagecache import cached_page
 
 
 @bp.route('/set-lang/<lang>')
@@ -12,12 +13,14 @@ def set_lang(lang):
 
 
 @bp.route('/')
+@cached_page
 def index():
-    services = Service.query.all()
+    services = refdata.services()
     return render_template('main/index.html', services=services)
 
 
 @bp.route('/services')
+@cached_page
 def services():
-    services = Service.query.all()
+    services = refdata.services()
     return render_template('main/services.html', services=services)
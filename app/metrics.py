@@ -0,0 +1,236 @@
+"""
+Opt-in request and SQL instrumentation (METRICS_ENABLED=1).
+
+For each endpoint, this module records request latency, the number of SQL
+statements, total SQL time and the slowest statements. SQL is counted with
+SQLAlchemy ``before/after_cursor_execute`` events and attributed to the
+request running on the same thread, via ``g``. Statements that run outside a
+request (the live-update watcher, CLI commands) are not counted. Histograms
+use fixed buckets and each endpoint keeps only ``METRICS_SLOWEST`` statement
+texts, so memory stays bounded however long the worker lives. Statements
+slower than ``METRICS_SLOW_QUERY_MS`` are also logged.
+
+Figures are per worker process. The admin page (/admin/metrics) shows the
+worker that served it. The Prometheus endpoint (/admin/metrics/prometheus)
+labels every series with ``worker`` so scrapes from different processes do
+not mix.
+
+A streamed response (SSE, exports) is recorded when its headers go out.
+Statements issued while its body streams are not counted.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from .models import db
+
+# Upper bounds; a final +Inf bucket catches the rest
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+STATEMENT_CHARS = 300
+UNMATCHED = '<unmatched>'
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory, approximate quantiles."""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (None past the last bound)."""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class EndpointStats:
+    __slots__ = ('requests', 'errors', 'latency', 'queries', 'sql_seconds', 'max_queries', 'slowest')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = Histogram(LATENCY_BUCKETS)
+        self.max_queries = 0
+        self.slowest = {}                   # statement -> worst seconds
+
+    def add_slow(self, statement, seconds, keep):
+        known = self.slowest.get(statement)
+        if known is not None:
+            if seconds > known:
+                self.slowest[statement] = seconds
+        elif len(self.slowest) < keep:
+            self.slowest[statement] = seconds
+        else:
+            fastest = min(self.slowest, key=self.slowest.get)
+            if seconds > self.slowest[fastest]:
+                del self.slowest[fastest]
+                self.slowest[statement] = seconds
+
+
+class Registry:
+    """Per-process endpoint stats, updated under one lock."""
+
+    def __init__(self, keep_slowest):
+        self.keep_slowest = keep_slowest
+        self.started = time.time()
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, status, seconds, queries, sql_seconds, statements):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.requests += 1
+            if status >= 500:
+                stats.errors += 1
+            stats.latency.observe(seconds)
+            stats.queries.observe(queries)
+            stats.sql_seconds.observe(sql_seconds)
+            stats.max_queries = max(stats.max_queries, queries)
+            for statement, elapsed in statements:
+                stats.add_slow(statement, elapsed, self.keep_slowest)
+
+    def snapshot(self):
+        """Rows for the admin page, slowest p95 first."""
+        with self._lock:
+            rows = [{
+                'endpoint': name,
+                'requests': s.requests,
+                'errors': s.errors,
+                'p50_ms': _ms(s.latency.quantile(0.5)),
+                'p95_ms': _ms(s.latency.quantile(0.95)),
+                'mean_ms': round(s.latency.mean() * 1000, 1),
+                'mean_queries': round(s.queries.mean(), 1),
+                'max_queries': s.max_queries,
+                'mean_sql_ms': round(s.sql_seconds.mean() * 1000, 1),
+                'slowest': sorted(((round(t * 1000, 1), sql) for sql, t in s.slowest.items()), reverse=True),
+            } for name, s in self._endpoints.items()]
+        # p95 None is past the last bucket (> 10 s): slowest of all
+        return sorted(rows, key=lambda r: float('inf') if r['p95_ms'] is None else r['p95_ms'], reverse=True)
+
+    def prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        worker = os.getpid()
+        lines = []
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            for metric, kind, help_text in (
+                ('autobook_requests_total', 'counter', 'Requests served.'),
+                ('autobook_request_errors_total', 'counter', 'Requests answered with a 5xx status.'),
+            ):
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+                for name, s in items:
+                    value = s.requests if metric == 'autobook_requests_total' else s.errors
+                    lines.append(f'{metric}{{endpoint="{name}",worker="{worker}"}} {value}')
+            for metric, attr, help_text in (
+                ('autobook_request_duration_seconds', 'latency', 'Request latency up to the response headers.'),
+                ('autobook_request_sql_queries', 'queries', 'SQL statements per request.'),
+                ('autobook_request_sql_seconds', 'sql_seconds', 'Time spent in SQL per request.'),
+            ):
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+                for name, s in items:
+                    lines += _histogram_lines(metric, f'endpoint="{name}",worker="{worker}"', getattr(s, attr))
+        return '\n'.join(lines) + '\n'
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _histogram_lines(metric, labels, histogram):
+    lines, cumulative = [], 0
+    for bound, n in zip(histogram.bounds, histogram.counts):
+        cumulative += n
+        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{metric}_sum{{{labels}}} {histogram.total}')
+    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+def _compact(statement):
+    return ' '.join(statement.split())[:STATEMENT_CHARS]
+
+
+def registry():
+    """This process's Registry, or None when instrumentation is off."""
+    return current_app.extensions.get('metrics')
+
+
+def init_metrics(app):
+    """Install the request hooks and engine listeners; call inside an app context."""
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.extensions['metrics'] = reg = Registry(app.config['METRICS_SLOWEST'])
+    slow_query = app.config['METRICS_SLOW_QUERY_MS'] / 1000.0
+    keep = app.config['METRICS_SLOWEST']
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_start', []).append(time.perf_counter())
+
+    @event.listens_for(db.engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        state = g.get('_metrics') if has_request_context() else None
+        if state is None:
+            return
+        state['queries'] += 1
+        state['sql_seconds'] += elapsed
+        statements = state['statements']
+        if len(statements) < keep or elapsed > statements[-1][1]:
+            statements.append((_compact(statement), elapsed))
+            statements.sort(key=lambda s: s[1], reverse=True)
+            del statements[keep:]
+        if elapsed >= slow_query:
+            app.logger.warning('slow query (%.1f ms) in %s: %s',
+                               elapsed * 1000, request.endpoint, _compact(statement))
+
+    def _record(status):
+        state = g.pop('_metrics', None)
+        if state is not None:
+            reg.record(request.endpoint or UNMATCHED, status, time.perf_counter() - state['start'],
+                       state['queries'], state['sql_seconds'], state['statements'])
+
+    @app.before_request
+    def _start_request():
+        g._metrics = {'start': time.perf_counter(), 'queries': 0, 'sql_seconds': 0.0, 'statements': []}
+
+    @app.after_request
+    def _finish_request(response):
+        _record(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _failed_request(exc):
+        _record(500)   # only still pending when an exception skipped after_request
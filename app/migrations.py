@@ -0,0 +1,201 @@
+"""
+Versioned schema migrations.
+
+Each step in ``MIGRATIONS`` has a version number, and the highest applied
+version is stored in ``app_setting`` under ``schema_version``. A database
+that is already current costs one primary-key SELECT, with no
+sqlite_master/PRAGMA introspection, no ``create_all`` and no seeding
+queries. Steps run in order, and the version is recorded after each one.
+Steps are idempotent, so a database created before versioning starts at
+0 and replays all of them safely.
+
+Run the steps once per deploy, before workers start:
+
+    flask --app run.py migrate-schema
+
+gunicorn.conf.py does this from its ``on_starting`` hook in the master
+process and tells workers to skip it (``MIGRATE_ON_START=0``). Development
+servers, seed.py and the benchmarks keep the default ``MIGRATE_ON_START=1``,
+so ``create_app()`` brings a scratch database up to date itself.
+
+To change the schema, append a step with the next version number. Do not
+edit or renumber existing steps.
+"""
+from datetime import time as _time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from .models import db, AppSetting, BusinessHours
+
+SCHEMA_VERSION_KEY = 'schema_version'
+
+
+# ── Steps ─────────────────────────────────────────────────────────────────────
+
+def _create_tables():
+    """Create tables that do not exist yet, with their indexes."""
+    db.create_all()
+
+
+def _add_columns():
+    """Add columns introduced after a table was first shipped."""
+    added = {
+        'business_hours': [
+            ('schedule_type', "VARCHAR(20) NOT NULL DEFAULT 'regular'", None),
+        ],
+        'bookings': [
+            ('updated_at', 'DATETIME', 'UPDATE bookings SET updated_at = created_at'),
+            ('series_id', 'INTEGER REFERENCES booking_series(id)', None),
+        ],
+    }
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        for table, columns in added.items():
+            present = {c['name'] for c in inspector.get_columns(table)}
+            for name, ddl, backfill in columns:
+                if name not in present:
+                    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+                    if backfill:
+                        conn.execute(text(backfill))
+
+
+def _add_indexes():
+    """Create model-declared indexes missing from tables built by older releases."""
+    from .schema import ensure_indexes
+
+    with db.engine.begin() as conn:
+        ensure_indexes(conn)
+
+
+def _seed_schedule_rows():
+    """Ensure all 14 business-hour rows and the schedule/refdata settings exist."""
+    from .refdata import VERSION_KEY
+
+    for key, value in (('active_schedule', 'regular'), (VERSION_KEY, '0')):
+        if db.session.get(AppSetting, key) is None:
+            db.session.add(AppSetting(key=key, value=value))
+
+    present = set(db.session.query(BusinessHours.day_of_week, BusinessHours.schedule_type))
+    # Ramadan defaults: Mon–Sat 9:00–15:00, Sunday closed
+    for day in range(7):
+        is_sunday = (day == 6)
+        for stype in ('regular', 'ramadan'):
+            if (day, stype) not in present:
+                close = _time(15, 0) if stype == 'ramadan' else _time(18, 0)
+                db.session.add(BusinessHours(
+                    day_of_week=day,
+                    schedule_type=stype,
+                    is_closed=is_sunday,
+                    open_time=None if is_sunday else _time(9, 0),
+                    close_time=None if is_sunday else close,
+                ))
+    db.session.commit()
+
+
+def _build_stats():
+    """Back-fill booking counters for databases that predate them."""
+    from .stats import ensure_built
+
+    ensure_built()
+
+
+def _status_seek_index():
+    """Replace the status index with (status, start_time, id) so filtered list pages seek."""
+    from .schema import ensure_indexes
+
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP INDEX IF EXISTS ix_bookings_status'))
+        ensure_indexes(conn)
+
+
+def _monotonic_booking_ids():
+    """
+    Rebuild ``bookings`` with AUTOINCREMENT, so ids of archived bookings are
+    never handed out again, and start the sequence past the highest id in
+    either table.
+    """
+    from .models import Booking
+
+    with db.engine.connect() as conn:
+        if conn.dialect.name != 'sqlite':
+            return
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        ddl = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'bookings'"
+        ).scalar()
+        if 'AUTOINCREMENT' not in ddl.upper():
+            conn.exec_driver_sql('ALTER TABLE bookings RENAME TO bookings_old')
+            old_indexes = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND tbl_name = 'bookings_old' AND sql IS NOT NULL"
+            ).scalars().all()
+            for name in old_indexes:
+                conn.exec_driver_sql(f'DROP INDEX {name}')
+            Booking.__table__.create(conn)
+            columns = ', '.join(c.name for c in Booking.__table__.columns)
+            conn.exec_driver_sql(f'INSERT INTO bookings ({columns}) SELECT {columns} FROM bookings_old')
+            conn.exec_driver_sql('DROP TABLE bookings_old')
+        high = conn.exec_driver_sql(
+            'SELECT max(coalesce((SELECT max(id) FROM bookings), 0), '
+            'coalesce((SELECT max(id) FROM bookings_archive), 0))'
+        ).scalar()
+        seq = conn.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = 'bookings'").scalar()
+        if seq is None:
+            conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('bookings', ?)", (high,))
+        elif seq < high:
+            conn.exec_driver_sql("UPDATE sqlite_sequence SET seq = ? WHERE name = 'bookings'", (high,))
+        conn.commit()
+
+
+MIGRATIONS = [
+    (1, 'create missing tables', _create_tables),
+    (2, 'add columns from older releases', _add_columns),
+    (3, 'add missing indexes', _add_indexes),
+    (4, 'seed business hours and settings', _seed_schedule_rows),
+    (5, 'build booking stats', _build_stats),
+    (6, 'index bookings by status and start time', _status_seek_index),
+    (7, 'never reuse booking ids', _monotonic_booking_ids),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def current_version():
+    """Applied schema version; 0 for a new database or one that predates versioning."""
+    try:
+        with db.engine.connect() as conn:
+            value = conn.execute(
+                text('SELECT value FROM app_setting WHERE key = :key'), {'key': SCHEMA_VERSION_KEY}
+            ).scalar()
+    except OperationalError:
+        return 0  # no app_setting table yet
+    return int(value) if value is not None else 0
+
+
+def upgrade():
+    """Apply pending steps in order; return the (version, description) pairs applied."""
+    version = current_version()
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        step()
+        AppSetting.set(SCHEMA_VERSION_KEY, str(number))
+        applied.append((number, description))
+    return applied
+
+
+@click.command('migrate-schema')
+@with_appcontext
+def migrate_schema_command():
+    """Apply pending schema migrations."""
+    # With MIGRATE_ON_START the steps already ran while the CLI built the app
+    applied = current_app.extensions.get('migrations', []) + upgrade()
+    for number, description in applied:
+        click.echo(f'  {number}: {description}')
+    click.echo(f'Schema at version {LATEST} ({len(applied)} step(s) applied).')
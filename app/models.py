@@ -1,7 +1,6 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
@@ -18,10 +17,9 @@ class User(UserMixin, db.Model):
     bookings = db.relationship('Booking', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-
-    def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Inline hash with the configured method; web requests go through app.passwords
+        from .passwords import hash_password
+        self.password_hash = hash_password(password)
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -96,6 +94,18 @@ class AppSetting(db.Model):
             db.session.add(cls(key=key, value=value))
         db.session.commit()
 
+    @classmethod
+    def increment(cls, key):
+        """Atomically add 1 to an integer setting; commits with the caller's transaction."""
+        result = db.session.execute(
+            db.update(cls)
+            .where(cls.key == key)
+            .values(value=db.cast(db.cast(cls.value, db.Integer) + 1, db.String))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.session.add(cls(key=key, value='1'))
+
     def __repr__(self):
         return f'<AppSetting {self.key}={self.value}>'
 
@@ -116,6 +126,117 @@ class Booking(db.Model):
     status = db.Column(db.String(20), default='pending', nullable=False)
     notes = db.Column(db.Text, default='')
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    series_id = db.Column(db.Integer, db.ForeignKey('booking_series.id'), nullable=True, index=True)
+
+    __table_args__ = (
+        # Staff overlap check in book(): staff_id = ? AND start_time < ? AND end_time > ?
+        db.Index('ix_bookings_staff_start', 'staff_id', 'start_time', 'end_time', 'status'),
+        # my_bookings / booking.calendar_events: user_id = ? ORDER BY / BETWEEN start_time
+        db.Index('ix_bookings_user_start', 'user_id', 'start_time'),
+        # Admin dashboard, bookings list and calendar: start_time ranges
+        db.Index('ix_bookings_start', 'start_time'),
+        # Admin bookings list filtered by status: status = ? ORDER BY start_time DESC, id DESC
+        db.Index('ix_bookings_status_start', 'status', 'start_time', 'id'),
+        # Calendar delta sync: updated_at > :since
+        db.Index('ix_bookings_updated', 'updated_at'),
+        # Never reuse an id: archived bookings keep theirs (app/archive.py)
+        {'sqlite_autoincrement': True},
+    )
+
+    is_archived = False
 
     def __repr__(self):
         return f'<Booking #{self.id} {self.status}>'
+
+
+class BookingArchive(db.Model):
+    """Past confirmed/cancelled bookings moved out of ``bookings`` by app.archive; same ids and columns."""
+    __tablename__ = 'bookings_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    notes = db.Column(db.Text, default='')
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    series_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    user = db.relationship('User', viewonly=True)
+    service = db.relationship('Service', viewonly=True)
+    staff = db.relationship('Staff', viewonly=True)
+
+    __table_args__ = (
+        # History views: same access paths as the live table
+        db.Index('ix_bookings_archive_user_start', 'user_id', 'start_time'),
+        db.Index('ix_bookings_archive_start', 'start_time'),
+        db.Index('ix_bookings_archive_staff_start', 'staff_id', 'start_time'),
+        db.Index('ix_bookings_archive_status_start', 'status', 'start_time', 'id'),
+    )
+
+    is_archived = True
+
+    def __repr__(self):
+        return f'<BookingArchive #{self.id} {self.status}>'
+
+
+class BookingSeries(db.Model):
+    """A recurring booking: its occurrences are Booking rows sharing ``series_id``."""
+    __tablename__ = 'booking_series'
+
+    FREQUENCY_WEEKLY = 'weekly'
+    FREQUENCY_BIWEEKLY = 'biweekly'
+    FREQUENCY_MONTHLY = 'monthly'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    frequency = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    bookings = db.relationship('Booking', backref='series', lazy=True)
+
+    def __repr__(self):
+        return f'<BookingSeries #{self.id} {self.frequency}>'
+
+
+class BookingStatusCount(db.Model):
+    """Materialized booking totals per status (maintained by app.stats)."""
+    __tablename__ = 'booking_status_counts'
+
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<BookingStatusCount {self.status}={self.count}>'
+
+
+class BookingDailyCount(db.Model):
+    """Materialized booking counts per day, staff member and status (maintained by app.stats)."""
+    __tablename__ = 'booking_daily_counts'
+
+    day = db.Column(db.Date, primary_key=True)
+    staff_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<BookingDailyCount {self.day}/{self.staff_id}/{self.status}={self.count}>'
+
+
+class BookingChange(db.Model):
+    """Append-only log of booking inserts/status changes, tailed by app.live watchers."""
+    __tablename__ = 'booking_changes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    old_status = db.Column(db.String(20), nullable=True)  # None for a new booking
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<BookingChange #{self.id} booking={self.booking_id} {self.old_status}->{self.status}>'
@@ -0,0 +1,89 @@
+"""
+Rendered-page cache for the public catalog pages.
+
+Pages rendered for anonymous visitors depend only on the language and the
+reference data, so they are cached per worker under ``(endpoint, lang,
+refdata version)`` in a bounded LRU (``app.extensions['page_cache']``).
+Each entry carries an ETag derived from the body, letting repeat visitors
+and crawlers revalidate with ``If-None-Match`` and get a bodiless 304. Admin edits bump
+the refdata version (see app.refdata), which moves every key on.
+
+Logged-in users and requests with pending flash messages bypass the cache,
+since their pages carry per-user navigation and alerts.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+
+from . import refdata
+from .i18n import DEFAULT_LANG
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry past ``maxsize``."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _get_cache():
+    cache = current_app.extensions.get('page_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'page_cache', LRUCache(current_app.config['PAGE_CACHE_SIZE']))
+    return cache
+
+
+def cached_page(view):
+    """Serve ``view`` from the page cache for anonymous visitors, with ETag/304."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_user.is_authenticated or '_flashes' in session:
+            return view(*args, **kwargs)
+
+        cache = _get_cache()
+        key = (request.endpoint, session.get('lang', DEFAULT_LANG), refdata.snapshot().version)
+        entry = cache.get(key)
+        if entry is None:
+            body = view(*args, **kwargs)
+            etag = hashlib.sha1(body.encode('utf-8')).hexdigest()[:20]
+            entry = (body, etag)
+            cache.set(key, entry)
+
+        body, etag = entry
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(body)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    return wrapper
@@ -0,0 +1,106 @@
+"""
+Keyset (seek) pagination for booking lists, newest first.
+
+Pages are addressed by an opaque cursor encoding ``(start_time, id)`` of the
+boundary row, so fetching page N costs the same as fetching page 1: the
+query seeks into the start_time index (``(status, start_time, id)`` when the
+list is filtered by status) instead of skipping OFFSET rows.
+"""
+import base64
+import heapq
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import and_, or_
+
+Page = namedtuple('Page', 'items next_cursor prev_cursor total')
+
+
+def encode_cursor(booking):
+    raw = f'{booking.start_time.isoformat()}|{booking.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(start_time, id)`` for a cursor, or None if it is missing/garbled."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        start_str, id_str = raw.split('|')
+        return datetime.fromisoformat(start_str), int(id_str)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _model(query):
+    return query.column_descriptions[0]['entity']
+
+
+def _older_than(model, key):
+    start, booking_id = key
+    return and_(model.start_time <= start,
+                or_(model.start_time < start, model.id < booking_id))
+
+
+def _newer_than(model, key):
+    start, booking_id = key
+    return and_(model.start_time >= start,
+                or_(model.start_time > start, model.id > booking_id))
+
+
+def _sort_key(booking):
+    return booking.start_time, booking.id
+
+
+def _seek(queries, limit, key, newer):
+    """Up to ``limit`` rows past ``key`` across ``queries``, merged in seek order."""
+    parts = []
+    for query in queries:
+        model = _model(query)
+        if newer:
+            query = query.filter(_newer_than(model, key))
+            order = (model.start_time.asc(), model.id.asc())
+        else:
+            if key:
+                query = query.filter(_older_than(model, key))
+            order = (model.start_time.desc(), model.id.desc())
+        parts.append(query.order_by(*order).limit(limit).all())
+    if len(parts) == 1:
+        return parts[0]
+    return list(islice(heapq.merge(*parts, key=_sort_key, reverse=not newer), limit))
+
+
+def keyset_page(query, after=None, before=None, per_page=50, with_total=False):
+    """
+    Return one newest-first ``Page`` of Booking ``query``.
+
+    ``query`` may also be a list of queries over tables sharing the booking
+    columns and id space (e.g. ``bookings`` and ``bookings_archive``); each is
+    seeked separately and the results merged. ``after`` continues towards
+    older bookings, ``before`` goes back towards newer ones. The total row
+    count is only computed when ``with_total``.
+    """
+    queries = list(query) if isinstance(query, (list, tuple)) else [query]
+    total = sum(q.order_by(None).count() for q in queries) if with_total else None
+    before_key = decode_cursor(before)
+    after_key = decode_cursor(after)
+
+    if before_key:
+        rows = _seek(queries, per_page + 1, before_key, newer=True)
+        has_newer = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_older = True
+    else:
+        rows = _seek(queries, per_page + 1, after_key, newer=False)
+        has_older = len(rows) > per_page
+        rows = rows[:per_page]
+        has_newer = after_key is not None
+
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_older else None,
+        prev_cursor=encode_cursor(rows[0]) if rows and has_newer else None,
+        total=total,
+    )
@@ -0,0 +1,102 @@
+"""
+Password hashing with configurable cost, rehash-on-login and a bounded executor.
+
+``PASSWORD_HASH_METHOD`` is a werkzeug method string such as
+``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``. A stored hash made with any
+other parameters still verifies. After a successful login it is replaced with
+a hash made with the current parameters, so changing the setting migrates
+users as they sign in.
+
+Hashing runs on a small per-process thread pool (``PASSWORD_HASH_WORKERS``).
+hashlib's scrypt and PBKDF2 release the GIL, so at most that many cores go to
+hashing however many request threads are logging in. Callers past
+``PASSWORD_HASH_MAX_PENDING`` get ``HashingBusy`` at once instead of queueing,
+which keeps a login burst from holding every worker thread. A caller that
+gives up waiting cancels its job; one already running keeps its slot until it
+finishes, so the pool's backlog stays bounded.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Verified when the email is unknown, so a miss costs as much as a wrong password
+_DUMMY_PASSWORD = 'not-a-real-password'
+
+
+class HashingBusy(Exception):
+    """Too many password hashes already pending in this process."""
+
+
+class _Hasher:
+    def __init__(self, method, workers, max_pending, wait_seconds):
+        self.method = method
+        self.wait_seconds = wait_seconds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.dummy_hash = generate_password_hash(_DUMMY_PASSWORD, method=method)
+        # werkzeug writes every parameter into the prefix ('scrypt' -> 'scrypt:32768:8:1')
+        self.prefix = self.dummy_hash.split('$', 1)[0]
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the job leaves the pool, not just until we stop waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.wait_seconds)
+        except TimeoutError:
+            future.cancel()
+            raise HashingBusy()
+
+
+def _hasher():
+    hasher = current_app.extensions.get('passwords')
+    if hasher is None:
+        config = current_app.config
+        hasher = current_app.extensions.setdefault('passwords', _Hasher(
+            config['PASSWORD_HASH_METHOD'],
+            config['PASSWORD_HASH_WORKERS'],
+            config['PASSWORD_HASH_MAX_PENDING'],
+            config['PASSWORD_HASH_WAIT_SECONDS'],
+        ))
+    return hasher
+
+
+def hash_password(password):
+    """Hash with the configured method, inline (for CLI/seed paths)."""
+    return generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def needs_rehash(password_hash):
+    """True if ``password_hash`` was made with other parameters than the configured ones."""
+    return password_hash.split('$', 1)[0] != _hasher().prefix
+
+
+def verify(user, password):
+    """
+    Check ``password`` for ``user`` (None for an unknown email) on the hash
+    pool. On success with outdated parameters, ``user.password_hash`` is
+    replaced; the caller commits. Raises HashingBusy.
+    """
+    hasher = _hasher()
+    if user is None:
+        hasher.run(check_password_hash, hasher.dummy_hash, password)
+        return False
+    if not hasher.run(check_password_hash, user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hasher.run(generate_password_hash, password, hasher.method)
+    return True
+
+
+def set_password(user, password):
+    """Hash a new password for ``user`` on the hash pool. Raises HashingBusy."""
+    hasher = _hasher()
+    user.password_hash = hasher.run(generate_password_hash, password, hasher.method)
@@ -0,0 +1,59 @@
+"""
+Read models for the booking list pages.
+
+The admin bookings list, the admin dashboard and My Bookings only display
+bookings. They get ``BookingRow`` namedtuples instead of ``Booking``
+instances. One query joins users, services and staff and projects just the
+displayed columns. Customer, service and staff names are carried on the
+row, so rendering makes no lazy loads. Column queries bypass the session's
+identity map and change tracking, so a page of rows costs a tuple each.
+
+``booking_rows()`` returns one query per table (bookings, plus
+bookings_archive when asked), and each still exposes its booking model to
+``pagination.keyset_page``. Pass ``keyset_page``'s items through
+``to_rows()``.
+"""
+from collections import namedtuple
+
+from sqlalchemy import literal
+
+from .models import db, Booking, BookingArchive, Service, Staff, User
+
+BookingRow = namedtuple('BookingRow', [
+    'id', 'start_time', 'end_time', 'status', 'notes',
+    'customer_name', 'customer_email', 'service_name', 'service_minutes', 'staff_name',
+    'is_archived',
+])
+
+
+def _query(model, criteria):
+    return (
+        db.session.query(
+            model.id,
+            model.start_time,
+            model.end_time,
+            model.status,
+            model.notes,
+            User.name,
+            User.email,
+            Service.name,
+            Service.duration_minutes,
+            Staff.name,
+            literal(model.is_archived),
+        )
+        .join(User, model.user_id == User.id)
+        .join(Service, model.service_id == Service.id)
+        .join(Staff, model.staff_id == Staff.id)
+        .filter(*(c(model) for c in criteria))
+    )
+
+
+def booking_rows(include_archive, *criteria):
+    """``[row query]`` for bookings (plus the archive when asked); criteria take the model."""
+    models = (Booking, BookingArchive) if include_archive else (Booking,)
+    return [_query(model, criteria) for model in models]
+
+
+def to_rows(results):
+    """BookingRow for each result row of a ``booking_rows()`` query."""
+    return [BookingRow._make(r) for r in results]
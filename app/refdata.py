@@ -0,0 +1,107 @@
+"""
+Process-local cache for reference data: services, staff, business hours and
+the active schedule.
+
+Each worker keeps an immutable snapshot in ``app.extensions['refdata']``,
+tagged with the value of the ``refdata_version`` row in ``app_setting``. A
+request reads that row once (a primary-key lookup) and only reloads the
+snapshot when another worker, or this one, has bumped it. Admin handlers call ``bump_version()`` inside the
+same transaction as their edit, so every gunicorn worker sees the change on
+its next request.
+"""
+import threading
+from collections import namedtuple
+
+from flask import current_app, g
+
+from .models import Service, Staff, BusinessHours, AppSetting
+
+VERSION_KEY = 'refdata_version'
+
+ServiceRow = namedtuple('ServiceRow', 'id name description duration_minutes price')
+StaffRow = namedtuple('StaffRow', 'id name email specialty')
+HoursRow = namedtuple('HoursRow', 'day_of_week schedule_type open_time close_time is_closed')
+
+Snapshot = namedtuple('Snapshot', 'version services staff services_by_id staff_by_id hours active_schedule')
+
+_lock = threading.Lock()
+
+
+def _load(version):
+    services = tuple(
+        ServiceRow(s.id, s.name, s.description, s.duration_minutes, s.price)
+        for s in Service.query.order_by(Service.id)
+    )
+    staff = tuple(
+        StaffRow(m.id, m.name, m.email, m.specialty)
+        for m in Staff.query.order_by(Staff.id)
+    )
+    hours = {
+        (bh.schedule_type, bh.day_of_week): HoursRow(
+            bh.day_of_week, bh.schedule_type, bh.open_time, bh.close_time, bh.is_closed)
+        for bh in BusinessHours.query.all()
+    }
+    return Snapshot(
+        version=version,
+        services=services,
+        staff=staff,
+        services_by_id={s.id: s for s in services},
+        staff_by_id={m.id: m for m in staff},
+        hours=hours,
+        active_schedule=AppSetting.get('active_schedule', 'regular'),
+    )
+
+
+def snapshot():
+    """Return the current snapshot, reloading it if the shared version moved."""
+    if 'refdata' in g:
+        return g.refdata
+
+    version = AppSetting.get(VERSION_KEY, '0')
+    extensions = current_app.extensions
+    snap = extensions.get('refdata')
+    if snap is None or snap.version != version:
+        with _lock:
+            snap = extensions.get('refdata')
+            if snap is None or snap.version != version:
+                snap = extensions['refdata'] = _load(version)
+    g.refdata = snap
+    return snap
+
+
+def services():
+    return snapshot().services
+
+
+def staff():
+    return snapshot().staff
+
+
+def get_service(service_id):
+    return snapshot().services_by_id.get(service_id)
+
+
+def get_staff(staff_id):
+    return snapshot().staff_by_id.get(staff_id)
+
+
+def active_schedule():
+    return snapshot().active_schedule
+
+
+def schedule(schedule_type=None):
+    """Return {day_of_week: HoursRow} for ``schedule_type`` (default: the active one)."""
+    snap = snapshot()
+    stype = schedule_type or snap.active_schedule
+    return {day: row for (st, day), row in snap.hours.items() if st == stype}
+
+
+def business_hours(day_of_week, schedule_type=None):
+    snap = snapshot()
+    return snap.hours.get((schedule_type or snap.active_schedule, day_of_week))
+
+
+def bump_version():
+    """Mark reference data as changed; commits with the caller's transaction."""
+    AppSetting.increment(VERSION_KEY)
+    g.pop('refdata', None)
@@ -0,0 +1,151 @@
+"""
+Index layer for the hot booking queries.
+
+``ensure_indexes`` back-fills the indexes declared on the models into SQLite
+files created before they existed (``db.create_all`` only indexes brand-new
+tables). ``explain_hot_queries`` calls the builders the routes use
+(``readmodels.booking_rows`` through ``pagination.keyset_page``,
+``feeds.event_rows``, ``admission.has_conflict``), records the SQL they
+emit and runs ``EXPLAIN QUERY PLAN`` over it, so a full-table scan or a
+whole-result sort shows up before it reaches production:
+
+    flask --app run.py explain-queries
+
+tests/test_query_plans.py runs the same check against a scratch database.
+"""
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect
+
+from .models import db
+
+# Placeholder arguments for the hot paths; only the plan matters
+_USER_ID = 1
+_STAFF_ID = 1
+_WINDOW = {'start': '2026-01-01T00:00:00', 'end': '2026-02-01T00:00:00'}
+
+
+def _hot_paths():
+    """{name: callable issuing that route's booking queries}."""
+    from datetime import datetime, time
+    from types import SimpleNamespace
+
+    from .admission import has_conflict
+    from .feeds import event_rows, window_criteria
+    from .models import Booking
+    from .pagination import keyset_page, encode_cursor
+    from .readmodels import booking_rows
+
+    start = datetime.fromisoformat(_WINDOW['start'])
+    end = datetime.fromisoformat(_WINDOW['end'])
+    day_start, day_end = datetime.combine(start.date(), time.min), datetime.combine(start.date(), time.max)
+    cursor = encode_cursor(SimpleNamespace(start_time=start, id=1000))
+
+    def page(history, *criteria, **kwargs):
+        return lambda: keyset_page(booking_rows(history, *criteria), **kwargs)
+
+    def feed(*criteria, **kwargs):
+        return lambda: list(event_rows(*criteria, **kwargs))
+
+    def dashboard_today():
+        [query] = booking_rows(False, lambda m: m.start_time.between(day_start, day_end))
+        return query.order_by(Booking.start_time, Booking.id).all()
+
+    mine = lambda m: m.user_id == _USER_ID  # noqa: E731
+    return {
+        'booking.book overlap': lambda: has_conflict(_STAFF_ID, start, end),
+        'booking.my_bookings': page(False, mine),
+        'booking.my_bookings next page': page(False, mine, after=cursor),
+        'booking.my_bookings history': page(True, mine),
+        'booking.calendar_events': feed(mine, *window_criteria(_WINDOW)),
+        'booking.calendar_events history': feed(mine, *window_criteria(_WINDOW), include_archive=True),
+        'admin.dashboard today': dashboard_today,
+        'admin.bookings': page(False),
+        'admin.bookings next page': page(False, after=cursor),
+        'admin.bookings previous page': page(False, before=cursor),
+        'admin.bookings by status': page(False, lambda m: m.status == Booking.STATUS_CONFIRMED),
+        'admin.bookings by status next page': page(False, lambda m: m.status == Booking.STATUS_CONFIRMED,
+                                                   after=cursor),
+        'admin.bookings by date': page(False, lambda m: m.start_time.between(day_start, day_end)),
+        'admin.bookings history': page(True),
+        'admin.bookings history by status': page(True, lambda m: m.status == Booking.STATUS_CONFIRMED),
+        'admin.calendar_events': feed(*window_criteria(_WINDOW)),
+        'admin.calendar_events history': feed(*window_criteria(_WINDOW), include_archive=True),
+        'admin.calendar_events delta': feed(lambda m: m.updated_at > start, *window_criteria(_WINDOW)),
+    }
+
+
+def ensure_indexes(conn):
+    """Create any model-declared index missing from an existing table."""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # db.create_all() will build it with its indexes
+        present = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in present:
+                index.create(conn)
+
+
+def _emitted(run):
+    """(statement, parameters) for each SELECT ``run()`` sends to the database."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        run()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def explain_hot_queries():
+    """Return {name: [plan detail, ...]} for the statements each hot path emits."""
+    plans = {}
+    try:
+        for name, run in _hot_paths().items():
+            conn = db.session.connection()
+            plans[name] = [
+                row[-1]
+                for statement, parameters in _emitted(run)
+                for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+            ]
+    finally:
+        db.session.rollback()
+    return plans
+
+
+def full_scans(plans):
+    """Names of queries whose plan walks a bookings table without an index."""
+    return [
+        name for name, details in plans.items()
+        if any(d.startswith('SCAN bookings') and 'INDEX' not in d for d in details)
+    ]
+
+
+def full_sorts(plans):
+    """Names of queries that sort their whole result instead of reading an index in order."""
+    return [
+        name for name, details in plans.items()
+        if any(d == 'USE TEMP B-TREE FOR ORDER BY' for d in details)
+    ]
+
+
+@click.command('explain-queries')
+@with_appcontext
+def explain_queries_command():
+    """Print query plans for the hot booking queries; fail on full scans or sorts."""
+    plans = explain_hot_queries()
+    for name, details in plans.items():
+        click.echo(name)
+        for detail in details:
+            click.echo(f'    {detail}')
+    problems = [f'full table scan in {name}' for name in full_scans(plans)]
+    problems += [f'full sort in {name}' for name in full_sorts(plans)]
+    if problems:
+        raise click.ClickException('; '.join(problems))
@@ -0,0 +1,147 @@
+"""
+Recurring booking series.
+
+``occurrences()`` expands a first start time into weekly, biweekly or monthly
+dates. ``check()`` validates the whole series in one pass: business hours come
+from the reference-data cache, and every staff member's bookings over the
+series window are loaded into one IntervalIndex. Each occurrence then costs a
+dictionary lookup and a binary search instead of the SQL round trips
+``book()`` makes per booking. Occurrences that fail get suggestions: a later
+time the same day with the same staff member, or another staff member free
+at the requested time.
+
+Insertion goes through ``admission.admit_many()``, which re-checks overlaps
+under the write lock and commits all occurrences or none.
+"""
+import calendar
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from . import refdata
+from .intervals import IntervalIndex
+from .models import BookingSeries
+
+FREQUENCIES = (
+    BookingSeries.FREQUENCY_WEEKLY,
+    BookingSeries.FREQUENCY_BIWEEKLY,
+    BookingSeries.FREQUENCY_MONTHLY,
+)
+MAX_OCCURRENCES = 52
+MAX_SUGGESTIONS = 3
+
+# Problem codes; the booking form maps them to translated messages
+PAST = 'past'
+CLOSED = 'closed'
+OUTSIDE_HOURS = 'hours'
+CONFLICT = 'conflict'
+
+Occurrence = namedtuple('Occurrence', 'start end problem suggestions')
+Suggestion = namedtuple('Suggestion', 'start staff_id staff_name')
+
+
+def _add_months(dt, months):
+    month = dt.month - 1 + months
+    year = dt.year + month // 12
+    month = month % 12 + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+def occurrences(first, frequency, count=None, until=None):
+    """
+    Start times of a series beginning at ``first``, stopping after ``count``
+    occurrences or on ``until`` (a date, inclusive), whichever comes first.
+    Raises ValueError for an unknown frequency or an unbounded/oversized series.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError('Unknown repeat frequency.')
+    if count is None and until is None:
+        raise ValueError('Give a number of occurrences or an end date.')
+    limit = min(count or MAX_OCCURRENCES + 1, MAX_OCCURRENCES + 1)
+
+    starts = []
+    while len(starts) < limit:
+        n = len(starts)
+        if frequency == BookingSeries.FREQUENCY_MONTHLY:
+            start = _add_months(first, n)
+        else:
+            start = first + timedelta(weeks=n * (2 if frequency == BookingSeries.FREQUENCY_BIWEEKLY else 1))
+        if until is not None and start.date() > until:
+            break
+        starts.append(start)
+    if len(starts) > MAX_OCCURRENCES:
+        raise ValueError(f'A series can have at most {MAX_OCCURRENCES} occurrences.')
+    return starts
+
+
+def _round_up(dt, base, step):
+    steps = -(-(dt - base) // step)
+    return base + steps * step
+
+
+def _suggest(index, staff_id, start, duration, bh, step, not_before):
+    """Up to MAX_SUGGESTIONS alternatives for an occurrence that cannot be booked as asked."""
+    if bh is None or bh.is_closed:
+        return []
+    open_dt = datetime.combine(start.date(), bh.open_time)
+    close_dt = datetime.combine(start.date(), bh.close_time)
+    suggestions = []
+
+    # Other staff members free at the requested time
+    if open_dt <= start and start + duration <= close_dt and start > not_before:
+        for member in refdata.staff():
+            if member.id != staff_id and not index.overlaps(member.id, start, start + duration):
+                suggestions.append(Suggestion(start, member.id, member.name))
+                if len(suggestions) == MAX_SUGGESTIONS - 1:
+                    break
+
+    # The same staff member's next free slot that day
+    member = refdata.get_staff(staff_id)
+    cursor = _round_up(max(start, open_dt, not_before), open_dt, step)
+    if cursor <= not_before:
+        cursor += step
+    while cursor + duration <= close_dt:
+        free = index[staff_id].next_free(cursor, duration, not_after=close_dt)
+        if free is None:
+            break
+        aligned = _round_up(free, open_dt, step)
+        if aligned == free:
+            suggestions.insert(0, Suggestion(free, staff_id, member.name))
+            break
+        cursor = aligned
+    return suggestions[:MAX_SUGGESTIONS]
+
+
+def check(service, staff_id, starts, step_minutes=15, now=None):
+    """Validate every start in ``starts``; return a list of Occurrence."""
+    if now is None:
+        now = datetime.utcnow()
+    if not starts:
+        return []
+
+    duration = timedelta(minutes=service.duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    schedule = refdata.schedule()
+    window_start = datetime.combine(min(starts).date(), datetime.min.time())
+    window_end = datetime.combine(max(starts).date() + timedelta(days=1), datetime.min.time())
+    index = IntervalIndex.load([m.id for m in refdata.staff()], window_start, window_end)
+
+    result = []
+    for start in starts:
+        end = start + duration
+        bh = schedule.get(start.weekday())
+        if start <= now:
+            problem = PAST
+        elif bh is None or bh.is_closed:
+            problem = CLOSED
+        elif start.time() < bh.open_time or end.time() > bh.close_time or end.date() != start.date():
+            problem = OUTSIDE_HOURS
+        elif index.overlaps(staff_id, start, end):
+            problem = CONFLICT
+        else:
+            index.add(staff_id, start, end)
+            result.append(Occurrence(start, end, None, []))
+            continue
+        result.append(Occurrence(start, end, problem,
+                                 _suggest(index, staff_id, start, duration, bh, step, now)))
+    return result
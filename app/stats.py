@@ -0,0 +1,107 @@
+"""
+Materialized booking counters.
+
+``booking_status_counts`` holds one row per status and
+``booking_daily_counts`` one row per (day, staff, status). Both are adjusted
+with +1/-1 upserts inside the transaction that creates a booking or changes
+its status, so the admin dashboard reads a handful of rows instead of
+counting the whole bookings table. ``rebuild()`` recomputes them from
+scratch (live and archived bookings) and reports any drift:
+
+    flask --app run.py rebuild-stats
+"""
+from datetime import date
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from .models import db, Booking, BookingArchive, BookingStatusCount, BookingDailyCount
+
+
+def _bump(booking, status, delta):
+    for model, values in (
+        (BookingStatusCount, {'status': status}),
+        (BookingDailyCount, {'day': booking.start_time.date(),
+                             'staff_id': booking.staff_id,
+                             'status': status}),
+    ):
+        stmt = insert(model).values(count=delta, **values)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=list(values),
+            set_={'count': model.count + delta},
+        ))
+
+
+def record(booking, old_status=None):
+    """Count a new booking, or move it from ``old_status`` to its current status."""
+    if old_status == booking.status:
+        return
+    if old_status is not None:
+        _bump(booking, old_status, -1)
+    _bump(booking, booking.status, 1)
+
+
+def status_counts():
+    """Return {status: count} from the materialized table."""
+    return {row.status: row.count for row in BookingStatusCount.query.all()}
+
+
+def _computed():
+    status, daily = {}, {}
+    for model in (Booking, BookingArchive):  # archived bookings still count
+        for st, count in db.session.query(model.status, func.count(model.id)).group_by(model.status):
+            status[st] = status.get(st, 0) + count
+        rows = (
+            db.session.query(func.date(model.start_time), model.staff_id, model.status,
+                             func.count(model.id))
+            .group_by(func.date(model.start_time), model.staff_id, model.status)
+        )
+        for day, staff_id, st, count in rows:
+            key = (str(day), staff_id, st)
+            daily[key] = daily.get(key, 0) + count
+    return status, daily
+
+
+def _stored():
+    status = {row.status: row.count for row in BookingStatusCount.query if row.count}
+    daily = {
+        (row.day.isoformat(), row.staff_id, row.status): row.count
+        for row in BookingDailyCount.query if row.count
+    }
+    return status, daily
+
+
+def rebuild():
+    """Recompute all counters from ``bookings``; return the number of drifted rows."""
+    status, daily = _computed()
+    stored_status, stored_daily = _stored()
+    drift = (
+        sum(1 for k in status.keys() | stored_status.keys() if status.get(k) != stored_status.get(k))
+        + sum(1 for k in daily.keys() | stored_daily.keys() if daily.get(k) != stored_daily.get(k))
+    )
+
+    BookingStatusCount.query.delete()
+    BookingDailyCount.query.delete()
+    db.session.add_all(BookingStatusCount(status=st, count=n) for st, n in status.items())
+    db.session.add_all(
+        BookingDailyCount(day=date.fromisoformat(day), staff_id=staff_id, status=st, count=n)
+        for (day, staff_id, st), n in daily.items()
+    )
+    db.session.commit()
+    return drift
+
+
+def ensure_built():
+    """Populate the counters once for databases that predate them."""
+    if BookingStatusCount.query.first() is None and Booking.query.first() is not None:
+        rebuild()
+
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Rebuild materialized booking counters and report drift."""
+    drift = rebuild()
+    click.echo(f'Booking stats rebuilt ({drift} drifted row(s) corrected).')
@@ -0,0 +1,51 @@
+"""
+Process-local fixed-window attempt counters for the login form.
+
+Checked before any database lookup or password hashing, so a blocked client
+costs a dictionary lookup. Counters live in each worker's memory rather than
+the database: that adds no write per attempt to the single SQLite writer, at
+the price of each worker counting separately (the effective limit is the
+configured one times the worker count). Keys are evicted oldest-first past
+``max_keys``, which bounds memory under a spray of addresses.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class Throttle:
+    """At most ``limit`` hits per key in each ``window`` seconds."""
+
+    def __init__(self, limit, window, max_keys=10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._counts = OrderedDict()  # key -> [window_start, hits]
+        self._lock = threading.Lock()
+
+    def _entry(self, key, now):
+        entry = self._counts.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            entry = self._counts[key] = [now, 0]
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_keys:
+                self._counts.popitem(last=False)
+        return entry
+
+    def blocked(self, key):
+        """True if ``key`` has used up its hits for the current window."""
+        with self._lock:
+            return self._entry(key, time.monotonic())[1] >= self.limit
+
+    def hit(self, key):
+        """Count one hit; return False if ``key`` was already over the limit."""
+        with self._lock:
+            entry = self._entry(key, time.monotonic())
+            if entry[1] >= self.limit:
+                return False
+            entry[1] += 1
+            return True
+
+    def reset(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
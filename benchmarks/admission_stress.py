@@ -0,0 +1,117 @@
+"""
+Multi-process stress test for booking admission.
+
+Spawns several worker processes that all try to book the same staff member
+inside one small time window, then checks the database for overlapping
+live bookings and reports admission latency percentiles:
+
+    python benchmarks/admission_stress.py --workers 8 --attempts 500
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import make_config, temp_db, latency_summary
+
+WINDOW_START = datetime(2030, 1, 7, 9, 0)   # a Monday, far in the future
+WINDOW_SLOTS = 16                           # 15-minute grid → 4 hours of contention
+
+
+def _setup(db_path):
+    from app import create_app
+    from app.models import db, User, Service, Staff
+
+    app = create_app(make_config(db_path))
+    with app.app_context():
+        user = User(name='Stress', email='stress@example.com')
+        user.set_password('stress')
+        db.session.add_all([
+            user,
+            Service(name='Stress Service', duration_minutes=30, price=1.0),
+            Staff(name='Stress Staff', email='staff@example.com'),
+        ])
+        db.session.commit()
+
+
+def _worker(db_path, attempts, seed, out):
+    from app import create_app
+    from app.admission import admit
+    from app.models import Booking
+
+    app = create_app(make_config(db_path))
+    rng = random.Random(seed)
+    latencies, results = [], {}
+    with app.app_context():
+        for _ in range(attempts):
+            start = WINDOW_START + timedelta(minutes=15 * rng.randrange(WINDOW_SLOTS))
+            booking = Booking(user_id=1, service_id=1, staff_id=1, start_time=start,
+                              end_time=start + timedelta(minutes=30), status=Booking.STATUS_PENDING)
+            t0 = time.perf_counter()
+            result = admit(booking)
+            latencies.append(time.perf_counter() - t0)
+            results[result] = results.get(result, 0) + 1
+    out.put((latencies, results))
+
+
+def _overlaps(db_path):
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    (count,) = conn.execute(
+        "SELECT count(*) FROM bookings a JOIN bookings b "
+        "ON a.staff_id = b.staff_id AND a.id < b.id "
+        "AND a.status != 'cancelled' AND b.status != 'cancelled' "
+        "AND a.start_time < b.end_time AND a.end_time > b.start_time"
+    ).fetchone()
+    (admitted,) = conn.execute("SELECT count(*) FROM bookings").fetchone()
+    conn.close()
+    return count, admitted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--attempts', type=int, default=500, help='attempts per worker')
+    args = parser.parse_args()
+
+    with temp_db() as db_path:
+        _setup(db_path)
+        out = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=_worker, args=(db_path, args.attempts, i, out))
+            for i in range(args.workers)
+        ]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        collected = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        latencies = [lat for lats, _ in collected for lat in lats]
+        results = {}
+        for _, res in collected:
+            for key, n in res.items():
+                results[key] = results.get(key, 0) + n
+        overlaps, stored = _overlaps(db_path)
+
+        report = {
+            'workers': args.workers,
+            'attempts': len(latencies),
+            'elapsed_s': round(elapsed, 3),
+            'results': results,
+            'stored_bookings': stored,
+            'overlapping_pairs': overlaps,
+            'latency_ms': latency_summary(latencies),
+        }
+        print(json.dumps(report, indent=2))
+    sys.exit(1 if overlaps else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Bulk import/export throughput.
+
+Writes ``--bookings`` synthetic, non-overlapping records to a scratch CSV
+and JSONL file, then times the overlap sweep, the import into an empty
+database and a full streaming export for each format, and prints JSON:
+
+    python benchmarks/bulk_import.py --bookings 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from common import make_config, temp_db
+
+STAFF = 20
+SERVICES = ['Oil Change', 'Tire Rotation & Balance', 'Brake Inspection', 'Engine Diagnostics']
+FIRST_DAY = datetime(2024, 1, 1, 8, 0)
+
+
+def _records(n):
+    for i in range(n):
+        staff = i % STAFF
+        slot = i // STAFF                      # 20 half-hour slots per staff per day
+        day, k = divmod(slot, 20)
+        start = FIRST_DAY + timedelta(days=day, minutes=30 * k)
+        yield {
+            'customer_email': f'customer{i % 5000}@example.com',
+            'customer_name': f'Customer {i % 5000}',
+            'service': SERVICES[i % len(SERVICES)],
+            'staff_email': f'staff{staff}@example.com',
+            'staff_name': f'Staff {staff}',
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(minutes=30)).isoformat(),
+            'status': 'confirmed' if i % 10 else 'cancelled',
+            'notes': '',
+            'created_at': (start - timedelta(days=3)).isoformat(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.bulk import find_overlaps, import_bookings, export_rows, read_records, write_records
+
+    report = {'bookings': args.bookings, 'formats': {}}
+    workdir = tempfile.mkdtemp()
+    try:
+        for fmt in ('csv', 'jsonl'):
+            src = os.path.join(workdir, f'in.{fmt}')
+            with open(src, 'w', newline='', encoding='utf-8') as f:
+                write_records(_records(args.bookings), f, fmt)
+
+            with temp_db() as db_path:
+                app = create_app(make_config(db_path))
+                with app.app_context():
+                    t0 = time.perf_counter()
+                    with open(src, newline='', encoding='utf-8') as f:
+                        problems = find_overlaps(read_records(f, fmt))
+                    validate = time.perf_counter() - t0
+
+                    t0 = time.perf_counter()
+                    with open(src, newline='', encoding='utf-8') as f:
+                        counts = import_bookings(read_records(f, fmt), args.chunk_size)
+                    imported = time.perf_counter() - t0
+
+                    t0 = time.perf_counter()
+                    with open(os.path.join(workdir, f'out.{fmt}'), 'w', newline='', encoding='utf-8') as f:
+                        exported = write_records(export_rows(), f, fmt)
+                    export = time.perf_counter() - t0
+
+            report['formats'][fmt] = {
+                'overlaps_found': len(problems),
+                'validate_s': round(validate, 2),
+                'import_s': round(imported, 2),
+                'import_rows_per_s': round(counts['bookings'] / imported),
+                'created': {k: v for k, v in counts.items() if k != 'bookings'},
+                'export_s': round(export, 2),
+                'export_rows_per_s': round(exported / export),
+            }
+    finally:
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
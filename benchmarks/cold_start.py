@@ -0,0 +1,103 @@
+"""
+Worker cold start: time to first response with and without per-worker migrations.
+
+Starts ``--workers`` fresh Python processes at once against one migrated
+database, as gunicorn does after a deploy. Each process builds the app,
+serves ``GET /`` through the test client and reports its time from process
+start to first response, its time in ``create_app()`` and the SQL
+statements that ran there. Three modes:
+
+- per-worker: every worker runs all migration steps (the old create_app)
+- versioned: MIGRATE_ON_START=1, one schema_version lookup per worker
+- pre-fork: MIGRATE_ON_START=0, as under gunicorn.conf.py
+
+    python benchmarks/cold_start.py --workers 4 --rounds 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import make_config, temp_db, latency_summary
+
+MODES = ('per-worker', 'versioned', 'pre-fork')
+
+
+def _child(mode, db_path, started):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = []
+    event.listen(Engine, 'before_cursor_execute', lambda *a: statements.append(1))
+
+    from app import create_app
+    from app.migrations import MIGRATIONS
+
+    t0 = time.perf_counter()
+    app = create_app(make_config(db_path, MIGRATE_ON_START=(mode == 'versioned')))
+    if mode == 'per-worker':
+        with app.app_context():
+            for _, _, step in MIGRATIONS:
+                step()
+    boot_seconds = time.perf_counter() - t0
+    boot_statements = len(statements)
+    status = app.test_client().get('/').status_code
+    print(json.dumps({
+        'first_response_s': time.time() - started,
+        'create_app_s': boot_seconds,
+        'status': status,
+        'create_app_statements': boot_statements,
+    }))
+
+
+def _round(mode, db_path, workers):
+    started = time.time()
+    procs = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', mode, db_path, repr(started)],
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        _child(sys.argv[2], sys.argv[3], float(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    from app import create_app
+
+    report = {'workers': args.workers, 'rounds': args.rounds, 'modes': {}}
+    with temp_db() as db_path:
+        create_app(make_config(db_path))   # migrate once up front
+        for mode in MODES:
+            first, boot, all_ready, statements = [], [], [], set()
+            for _ in range(args.rounds):
+                results = _round(mode, db_path, args.workers)
+                first.extend(r['first_response_s'] for r in results)
+                boot.extend(r['create_app_s'] for r in results)
+                all_ready.append(max(r['first_response_s'] for r in results))
+                statements.update(r['create_app_statements'] for r in results)
+                assert all(r['status'] == 200 for r in results), results
+            report['modes'][mode] = {
+                'first_response_ms': latency_summary(first),
+                'create_app_ms': latency_summary(boot),
+                'all_workers_ready_ms': round(sum(all_ready) / len(all_ready) * 1000, 1),
+                'create_app_statements': sorted(statements),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
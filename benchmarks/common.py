@@ -0,0 +1,47 @@
+"""Shared helpers for the benchmark scripts: throwaway databases and stats."""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+def make_config(db_path, **overrides):
+    """Return a Config subclass pointing at ``db_path`` with ``overrides`` applied."""
+    attrs = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path}
+    attrs.update(overrides)
+    return type('BenchConfig', (Config,), attrs)
+
+
+@contextmanager
+def temp_db():
+    """Yield a path for a scratch SQLite file and remove it (and WAL files) afterwards."""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def latency_summary(latencies):
+    """p50/p95/p99/max in milliseconds for a list of durations in seconds."""
+    values = sorted(latencies)
+    return {
+        'p50': round(percentile(values, 50) * 1000, 3),
+        'p95': round(percentile(values, 95) * 1000, 3),
+        'p99': round(percentile(values, 99) * 1000, 3),
+        'max': round(values[-1] * 1000, 3) if values else 0.0,
+    }
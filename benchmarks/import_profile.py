@@ -0,0 +1,71 @@
+"""
+Startup import profile of ``run:app``, from ``python -X importtime``.
+
+Imports run.py in a fresh interpreter (which builds the app, as a gunicorn
+worker does without preload_app), parses the importtime log and prints JSON
+with the total, the cumulative time per top-level package and the
+``--top`` slowest modules by self time:
+
+    python benchmarks/import_profile.py --top 20
+    LAZY_ADMIN=1 python benchmarks/import_profile.py
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from common import temp_db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def _profile(db_path):
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path)
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import run'],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - t0
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    with temp_db() as db_path:
+        _profile(db_path)                   # first run creates the schema
+        wall, modules = _profile(db_path)
+
+    packages = {}
+    for name, self_us, _, _ in modules:
+        top = name.split('.')[0]
+        packages[top] = packages.get(top, 0) + self_us
+    imports_us = sum(self_us for _, self_us, _, _ in modules)
+    slowest = sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]
+    print(json.dumps({
+        'lazy_admin': os.environ.get('LAZY_ADMIN', '0') == '1',
+        'wall_ms': round(wall * 1000, 1),
+        'imports_ms': round(imports_us / 1000, 1),
+        'modules': len(modules),
+        'admin_routes_loaded': any(m[0] == 'app.admin.routes' for m in modules),
+        'by_package_ms': {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        },
+        'slowest_self_ms': {name: round(self_us / 1000, 1) for name, self_us, _, _ in slowest},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: per-check SQL overlap probe vs. the in-memory IntervalIndex.
+
+Seeds one database with bookings spread over several staff members, then
+answers the same batch of random overlap questions both ways and prints the
+timings (and confirms both agree) as JSON:
+
+    python benchmarks/interval_index.py --bookings 20000 --checks 5000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import make_config, temp_db
+
+WINDOW_START = datetime(2030, 1, 1)
+STAFF = 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=20000)
+    parser.add_argument('--checks', type=int, default=5000)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.admission import has_conflict
+    from app.intervals import IntervalIndex
+    from app.models import db, User, Service, Staff, Booking
+
+    rng = random.Random(42)
+    with temp_db() as db_path:
+        app = create_app(make_config(db_path))
+        with app.app_context():
+            db.session.add(User(name='Bench', email='bench@example.com', password_hash='x'))
+            db.session.add(Service(name='Bench', duration_minutes=30, price=1.0))
+            db.session.add_all(Staff(name=f'Staff {i}', email=f'staff{i}@example.com') for i in range(STAFF))
+            db.session.flush()
+            minutes = args.bookings * 45 // STAFF
+            db.session.bulk_insert_mappings(Booking, [
+                {
+                    'user_id': 1, 'service_id': 1, 'staff_id': 1 + i % STAFF,
+                    'start_time': WINDOW_START + timedelta(minutes=m),
+                    'end_time': WINDOW_START + timedelta(minutes=m + 30),
+                    'status': Booking.STATUS_CONFIRMED, 'created_at': WINDOW_START,
+                }
+                for i, m in enumerate(rng.randrange(minutes) for _ in range(args.bookings))
+            ])
+            db.session.commit()
+            window_end = WINDOW_START + timedelta(minutes=minutes + 30)
+
+            checks = []
+            for _ in range(args.checks):
+                start = WINDOW_START + timedelta(minutes=rng.randrange(minutes))
+                checks.append((1 + rng.randrange(STAFF), start, start + timedelta(minutes=30)))
+
+            t0 = time.perf_counter()
+            sql_answers = [has_conflict(staff_id, s, e) for staff_id, s, e in checks]
+            sql_time = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            index = IntervalIndex.load(range(1, STAFF + 1), WINDOW_START, window_end)
+            load_time = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            index_answers = [index.overlaps(staff_id, s, e) for staff_id, s, e in checks]
+            query_time = time.perf_counter() - t0
+
+    print(json.dumps({
+        'bookings': args.bookings,
+        'checks': args.checks,
+        'agree': sql_answers == index_answers,
+        'sql_total_ms': round(sql_time * 1000, 2),
+        'sql_per_check_us': round(sql_time / args.checks * 1e6, 2),
+        'index_load_ms': round(load_time * 1000, 2),
+        'index_query_total_ms': round(query_time * 1000, 2),
+        'index_per_check_us': round(query_time / args.checks * 1e6, 2),
+        'speedup_incl_load': round(sql_time / (load_time + query_time), 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Password hashing cost and login burst protection.
+
+Times one hash with each ``--methods`` entry, checks that signing in with a
+hash made under older parameters upgrades it, then serves the app from a
+threaded server while ``--attackers`` clients post wrong passwords for
+``--seconds`` and ``--readers`` clients load the index page. The burst runs
+twice: "unprotected" (no throttle, a hash pool as large as the burst) and
+"protected" (the configured defaults). Prints JSON:
+
+    python benchmarks/login_throughput.py --attackers 16 --readers 4
+"""
+import argparse
+import http.client
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlencode
+
+from common import make_config, temp_db, latency_summary
+
+METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000']
+OLD_METHOD = 'pbkdf2:sha256:260000'
+UNPROTECTED = {
+    'LOGIN_IP_LIMIT': 10 ** 9,
+    'LOGIN_EMAIL_LIMIT': 10 ** 9,
+    'PASSWORD_HASH_WORKERS': 64,
+    'PASSWORD_HASH_MAX_PENDING': 10 ** 6,
+}
+
+
+def _hash_cost(methods, rounds):
+    from werkzeug.security import generate_password_hash
+
+    cost = {}
+    for method in methods:
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            generate_password_hash('bench', method=method)
+        cost[method] = round((time.perf_counter() - t0) / rounds * 1000, 1)
+    return cost
+
+
+def _seed(app):
+    from werkzeug.security import generate_password_hash
+    from app.models import db, User
+
+    with app.app_context():
+        user = User(name='Customer', email='user@example.com')
+        user.password_hash = generate_password_hash('bench', method=OLD_METHOD)
+        db.session.add(user)
+        db.session.commit()
+
+
+def _rehash_check(app):
+    from app.models import User
+
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': 'user@example.com', 'password': 'bench'})
+    with app.app_context():
+        stored = User.query.filter_by(email='user@example.com').one().password_hash
+    return {
+        'login_status': response.status_code,
+        'before': OLD_METHOD,
+        'after': stored.split('$', 1)[0],
+    }
+
+
+def _client(port, stop, fn, results, lock):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    mine = []
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            status = fn(conn)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            status = 'error'
+        mine.append((time.perf_counter() - t0, status))
+    conn.close()
+    with lock:
+        results.extend(mine)
+
+
+def _attempt(conn):
+    body = urlencode({'email': 'user@example.com', 'password': 'wrong'})
+    conn.request('POST', '/auth/login', body=body,
+                  headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def _read(conn):
+    conn.request('GET', '/')
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def _burst(db_path, overrides, args):
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    app = create_app(make_config(db_path, **overrides))
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop, lock = threading.Event(), threading.Lock()
+    attempts, reads = [], []
+    threads = [threading.Thread(target=_client, args=(server.port, stop, _attempt, attempts, lock))
+               for _ in range(args.attackers)]
+    threads += [threading.Thread(target=_client, args=(server.port, stop, _read, reads, lock))
+                for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+
+    by_status = {}
+    for _, status in attempts:
+        by_status[str(status)] = by_status.get(str(status), 0) + 1
+    return {
+        'login_attempts': len(attempts),
+        'login_by_status': by_status,
+        'login_latency_ms': latency_summary([t for t, _ in attempts]),
+        'index_rps': round(len(reads) / args.seconds, 1),
+        'index_errors': sum(1 for _, status in reads if status != 200),
+        'index_latency_ms': latency_summary([t for t, _ in reads]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--methods', nargs='+', default=METHODS)
+    parser.add_argument('--rounds', type=int, default=5, help='hashes timed per method')
+    parser.add_argument('--attackers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from app import create_app
+
+    report = {'hash_ms': _hash_cost(args.methods, args.rounds)}
+    with temp_db() as db_path:
+        app = create_app(make_config(db_path))
+        _seed(app)
+        report['rehash_on_login'] = _rehash_check(app)
+        report['unprotected'] = _burst(db_path, UNPROTECTED, args)
+        report['protected'] = _burst(db_path, {}, args)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
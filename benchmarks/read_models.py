@@ -0,0 +1,115 @@
+"""
+Booking list loading: ORM instances plus lazy loads vs. BookingRow read models.
+
+On a synthetic shop (benchmarks/shop.py), loads the newest ``--rows``
+bookings two ways and touches every displayed field, as the list templates
+do. The ``orm`` way is Booking instances with user/service/staff
+relationships. The ``rows`` way is ``readmodels.booking_rows()``. For each
+it reports time, SQL statements, peak traced memory and the identity map
+size. It then times the full /admin/bookings page with ``--rows`` per page.
+Prints JSON:
+
+    python benchmarks/read_models.py --rows 2000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from common import make_config, temp_db, latency_summary
+from shop import ADMIN_EMAIL, PASSWORD, build_shop
+
+
+def _touch_orm(bookings):
+    return [(b.id, b.start_time, b.status, b.notes, b.user.name, b.user.email,
+             b.service.name, b.service.duration_minutes, b.staff.name, b.is_archived) for b in bookings]
+
+
+def _touch_rows(rows):
+    return [(r.id, r.start_time, r.status, r.notes, r.customer_name, r.customer_email,
+             r.service_name, r.service_minutes, r.staff_name, r.is_archived) for r in rows]
+
+
+def _measure(load, rounds):
+    from sqlalchemy import event
+    from app.models import db
+
+    statements = []
+
+    def count(*_):
+        statements.append(1)
+
+    timings, peaks, identity = [], [], 0
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(rounds):
+            db.session.remove()
+            gc.collect()
+            statements.clear()
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            result = load()
+            timings.append(time.perf_counter() - t0)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            identity = len(db.session.identity_map)   # while the result is still alive
+            del result
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return {
+        'ms': latency_summary(timings),
+        'statements': len(statements),
+        'peak_kb': round(min(peaks) / 1024),
+        'identity_map': identity,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--years', type=int, default=2)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.models import Booking
+    from app.readmodels import booking_rows, to_rows
+
+    report = {'per_page': args.rows}
+    with temp_db() as db_path:
+        app = create_app(make_config(db_path, BOOKINGS_PER_PAGE=args.rows))
+        with app.app_context():
+            report['shop'] = build_shop(users=args.users, years=args.years)
+            newest = (Booking.start_time.desc(), Booking.id.desc())
+
+            def orm():
+                bookings = Booking.query.order_by(*newest).limit(args.rows).all()
+                _touch_orm(bookings)
+                return bookings
+
+            def rows():
+                [query] = booking_rows(False)
+                result = to_rows(query.order_by(*newest).limit(args.rows))
+                _touch_rows(result)
+                return result
+
+            assert _touch_orm(orm()) == _touch_rows(rows())
+            report['orm'] = _measure(orm, args.rounds)
+            report['read_model'] = _measure(rows, args.rounds)
+
+        client = app.test_client()
+        client.post('/auth/login', data={'email': ADMIN_EMAIL, 'password': PASSWORD})
+        client.get('/admin/bookings')
+        timings = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            client.get('/admin/bookings')
+            timings.append(time.perf_counter() - t0)
+        report['admin_bookings_page_ms'] = latency_summary(timings)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Template render benchmark in English and Arabic.
+
+Renders every page template through the test client as an admin, in both
+languages, and reports the mean render time per page. It also times the
+per-key ``t()`` lookup of the old closure-per-render approach against the
+compiled Translator:
+
+    python benchmarks/render_i18n.py --rounds 50
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from common import make_config, temp_db
+
+PAGES = [
+    '/', '/services', '/auth/change-password',
+    '/booking/book', '/booking/my-bookings', '/booking/calendar',
+    '/admin/', '/admin/bookings', '/admin/services', '/admin/staff',
+    '/admin/hours', '/admin/calendar', '/admin/users',
+]
+
+
+def _seed(db):
+    from app.models import User, Service, Staff, Booking
+
+    admin = User(name='Admin', email='admin@example.com', is_admin=True)
+    admin.set_password('bench')
+    db.session.add(admin)
+    db.session.add_all(Service(name=f'Service {i}', description='Desc', duration_minutes=30, price=10.0)
+                       for i in range(7))
+    db.session.add_all(Staff(name=f'Staff {i}', email=f'staff{i}@example.com') for i in range(3))
+    db.session.flush()
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    db.session.add_all(
+        Booking(user_id=1, service_id=1 + i % 7, staff_id=1 + i % 3,
+                start_time=now + timedelta(hours=i), end_time=now + timedelta(hours=i, minutes=30))
+        for i in range(-20, 30)
+    )
+    db.session.commit()
+
+
+def _lookup_bench(rounds):
+    from app.i18n import TRANSLATIONS, compile_catalogs
+
+    keys = list(TRANSLATIONS['en']) + ['missing_key'] * 20
+    results = {}
+    for lang in ('en', 'ar'):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            strings = TRANSLATIONS.get(lang, TRANSLATIONS['en'])
+
+            def t(key):
+                return strings.get(key, TRANSLATIONS['en'].get(key, key))
+            for key in keys:
+                t(key)
+        legacy = time.perf_counter() - t0
+
+        translator = compile_catalogs()[lang].t
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for key in keys:
+                translator(key)
+        compiled = time.perf_counter() - t0
+        results[lang] = {
+            'legacy_us_per_key': round(legacy / rounds / len(keys) * 1e6, 4),
+            'compiled_us_per_key': round(compiled / rounds / len(keys) * 1e6, 4),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.models import db
+
+    report = {'pages_ms': {}, 'lookup': _lookup_bench(args.rounds * 10)}
+    with temp_db() as db_path:
+        app = create_app(make_config(db_path))
+        with app.app_context():
+            _seed(db)
+        client = app.test_client()
+        client.post('/auth/login', data={'email': 'admin@example.com', 'password': 'bench'})
+        for lang in ('en', 'ar'):
+            client.get(f'/set-lang/{lang}')
+            timings = {}
+            for page in PAGES:
+                client.get(page)  # warm the template cache
+                t0 = time.perf_counter()
+                for _ in range(args.rounds):
+                    resp = client.get(page)
+                    assert resp.status_code == 200, (page, resp.status_code)
+                timings[page] = round((time.perf_counter() - t0) / args.rounds * 1000, 3)
+            report['pages_ms'][lang] = timings
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
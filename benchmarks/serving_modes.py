@@ -0,0 +1,217 @@
+"""
+Load test: gunicorn sync workers vs. threaded (gthread) workers.
+
+Seeds a scratch database, then for each serving mode starts gunicorn with
+gunicorn.conf.py (sync mode overrides the worker class) and drives three
+endpoints in turn with ``--concurrency`` keep-alive clients for
+``--seconds`` each: the public index, the admin calendar feed and the
+booking form POST. Meanwhile ``--streams`` admins keep the live calendar
+(/admin/calendar/stream) open, as they do in production; a sync worker is
+pinned by each one. Prints requests/sec and latency percentiles as JSON:
+
+    python benchmarks/serving_modes.py --workers 2 --threads 8 --streams 1
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from common import make_config, temp_db, latency_summary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_MONDAY = datetime(2030, 1, 7)
+CLIENT_TIMEOUT = 5
+
+
+def _seed(db_path):
+    from app import create_app
+    from app.models import db, User, Service, Staff, Booking
+
+    app = create_app(make_config(db_path))
+    with app.app_context():
+        admin = User(name='Admin', email='admin@example.com', is_admin=True)
+        admin.set_password('bench')
+        user = User(name='Customer', email='user@example.com')
+        user.set_password('bench')
+        db.session.add_all([admin, user])
+        db.session.add_all(Service(name=f'Service {i}', duration_minutes=30, price=10.0) for i in range(5))
+        db.session.add_all(Staff(name=f'Staff {i}', email=f'staff{i}@example.com') for i in range(4))
+        db.session.flush()
+        db.session.bulk_insert_mappings(Booking, [
+            {
+                'user_id': 2, 'service_id': 1 + i % 5, 'staff_id': 1 + i % 4,
+                'start_time': FIRST_MONDAY - timedelta(days=30) + timedelta(hours=i),
+                'end_time': FIRST_MONDAY - timedelta(days=30) + timedelta(hours=i, minutes=30),
+                'status': Booking.STATUS_CONFIRMED, 'created_at': FIRST_MONDAY,
+                'updated_at': FIRST_MONDAY,
+            }
+            for i in range(2000)
+        ])
+        db.session.commit()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _start(mode, db_path, port, workers, threads):
+    # gunicorn silently swaps sync for gthread when threads > 1
+    threads = 1 if mode == 'sync' else threads
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path, SECRET_KEY='bench',
+               WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+               GUNICORN_BIND=f'127.0.0.1:{port}')
+    cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+    if mode == 'sync':
+        cmd += ['--worker-class', 'sync']
+    proc = subprocess.Popen(cmd + ['run:app'], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f'gunicorn ({mode}) did not start')
+
+
+def _login(port, email):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/auth/login', body=urlencode({'email': email, 'password': 'bench'}),
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    resp = conn.getresponse()
+    resp.read()
+    conn.close()
+    cookie = resp.getheader('Set-Cookie', '')
+    return cookie.split(';', 1)[0]
+
+
+def _requests(endpoint, cookies, rng):
+    """Yield (method, path, body, headers) for ``endpoint`` forever."""
+    form = {'Content-Type': 'application/x-www-form-urlencoded'}
+    while True:
+        if endpoint == 'main.index':
+            yield 'GET', '/', None, {}
+        elif endpoint == 'calendar_events':
+            day = FIRST_MONDAY - timedelta(days=30 + rng.randrange(60))
+            query = urlencode({'start': day.date().isoformat(),
+                               'end': (day + timedelta(days=7)).date().isoformat()})
+            yield 'GET', f'/admin/calendar/events?{query}', None, {'Cookie': cookies['admin']}
+        else:
+            start = FIRST_MONDAY + timedelta(weeks=rng.randrange(200), days=rng.randrange(6),
+                                             hours=9 + rng.randrange(8))
+            body = urlencode({'service_id': 1 + rng.randrange(5), 'staff_id': 1 + rng.randrange(4),
+                              'start_time': start.strftime('%Y-%m-%dT%H:%M')})
+            yield 'POST', '/booking/book', body, dict(form, Cookie=cookies['user'])
+
+
+def _client(port, endpoint, cookies, stop, latencies, errors, seed):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=CLIENT_TIMEOUT)
+    for method, path, body, headers in _requests(endpoint, cookies, rng):
+        if stop.is_set():
+            break
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 400:
+                errors.append(resp.status)
+            latencies.append(time.perf_counter() - t0)
+        except (OSError, http.client.HTTPException):
+            errors.append('conn')
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=CLIENT_TIMEOUT)
+    conn.close()
+
+
+def _stream_client(port, cookie, stop):
+    """Keep the admin live-calendar stream open until ``stop`` is set."""
+    sock = socket.create_connection(('127.0.0.1', port), timeout=1)
+    sock.sendall(f'GET /admin/calendar/stream HTTP/1.1\r\nHost: localhost\r\n'
+                 f'Cookie: {cookie}\r\n\r\n'.encode())
+    while not stop.is_set():
+        try:
+            sock.recv(4096)
+        except OSError:
+            pass
+    sock.close()
+
+
+def _run_endpoint(port, endpoint, cookies, concurrency, seconds):
+    stop = threading.Event()
+    latencies, errors = [], []
+    clients = [
+        threading.Thread(target=_client, args=(port, endpoint, cookies, stop, latencies, errors, i))
+        for i in range(concurrency)
+    ]
+    t0 = time.perf_counter()
+    for c in clients:
+        c.start()
+    time.sleep(seconds)
+    stop.set()
+    for c in clients:
+        c.join()
+    elapsed = time.perf_counter() - t0
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--streams', type=int, default=1)
+    parser.add_argument('--modes', default='sync,gthread')
+    args = parser.parse_args()
+
+    report = {'workers': args.workers, 'threads': args.threads, 'concurrency': args.concurrency,
+              'streams': args.streams, 'modes': {}}
+    for mode in args.modes.split(','):
+        with temp_db() as db_path:
+            _seed(db_path)
+            port = _free_port()
+            proc = _start(mode, db_path, port, args.workers, args.threads)
+            try:
+                cookies = {'admin': _login(port, 'admin@example.com'),
+                           'user': _login(port, 'user@example.com')}
+                stop_streams = threading.Event()
+                for _ in range(args.streams):
+                    threading.Thread(target=_stream_client, daemon=True,
+                                     args=(port, cookies['admin'], stop_streams)).start()
+                time.sleep(1)
+                report['modes'][mode] = {
+                    endpoint: _run_endpoint(port, endpoint, cookies, args.concurrency, args.seconds)
+                    for endpoint in ('main.index', 'calendar_events', 'book')
+                }
+                stop_streams.set()
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()  # a sync worker still stuck in a stream
+                    proc.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
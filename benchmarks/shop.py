@@ -0,0 +1,103 @@
+"""
+Synthetic shop for the benchmark suite, shaped like seed.py's car shop.
+
+Services and staff cycle through seed.py's SERVICES and STAFF (numbered
+once the lists run out), and hours come from its regular schedule. Bookings
+fill each staff member's open hours from ``years`` back to four weeks
+ahead. Past bookings are confirmed or cancelled; upcoming ones are pending
+or confirmed. Everyone's password is ``bench``, with one admin:
+admin@example.com.
+"""
+import random
+from datetime import datetime, timedelta
+
+from seed import SERVICES, STAFF, SCHEDULES
+
+PASSWORD = 'bench'
+ADMIN_EMAIL = 'admin@example.com'
+AHEAD_DAYS = 28
+CHUNK = 5000
+
+
+def build_shop(users=500, staff=6, services=7, years=2, fill=0.6, seed=1, today=None):
+    """Populate the current app's (empty, migrated) database; return a summary dict."""
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+
+    from app import refdata, stats
+    from app.models import db, User, Service, Staff, Booking, BusinessHours
+
+    rng = random.Random(seed)
+    today = today or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = generate_password_hash(PASSWORD)
+
+    db.session.add(User(name='Admin', email=ADMIN_EMAIL, password_hash=password_hash, is_admin=True))
+    db.session.add_all(
+        User(name=f'Customer {i}', email=f'customer{i}@example.com', password_hash=password_hash)
+        for i in range(users)
+    )
+    # Cycle through seed.py's rows, numbering names from the second lap on
+    for i in range(services):
+        name, desc, duration, price = SERVICES[i % len(SERVICES)]
+        lap = i // len(SERVICES)
+        db.session.add(Service(name=f'{name} {lap + 1}' if lap else name, description=desc,
+                               duration_minutes=duration, price=price))
+    for i in range(staff):
+        name, email, specialty = STAFF[i % len(STAFF)]
+        lap = i // len(STAFF)
+        if lap:
+            name, email = f'{name} {lap + 1}', email.replace('@', f'{lap + 1}@')
+        db.session.add(Staff(name=name, email=email, specialty=specialty))
+    for day, open_t, close_t, closed in SCHEDULES['regular']:
+        bh = BusinessHours.query.filter_by(day_of_week=day, schedule_type='regular').one()
+        bh.open_time, bh.close_time, bh.is_closed = open_t, close_t, closed
+    db.session.flush()
+
+    customer_ids = [u.id for u in User.query.filter_by(is_admin=False)]
+    catalog = [(s.id, s.duration_minutes) for s in Service.query]
+    staff_ids = [m.id for m in Staff.query]
+    hours = {day: (open_t, close_t) for day, open_t, close_t, closed in SCHEDULES['regular'] if not closed}
+
+    rows, total = [], 0
+    day = today - timedelta(days=365 * years)
+    last = today + timedelta(days=AHEAD_DAYS)
+    conn = db.session.connection()
+    while day < last:
+        if day.weekday() in hours:
+            open_t, close_t = hours[day.weekday()]
+            close_dt = datetime.combine(day.date(), close_t)
+            past = day < today
+            for staff_id in staff_ids:
+                cursor = datetime.combine(day.date(), open_t)
+                while True:
+                    service_id, minutes = rng.choice(catalog)
+                    end = cursor + timedelta(minutes=minutes)
+                    if end > close_dt:
+                        break
+                    if rng.random() < fill:
+                        if past:
+                            status = Booking.STATUS_CANCELLED if rng.random() < 0.15 else Booking.STATUS_CONFIRMED
+                        else:
+                            status = Booking.STATUS_PENDING if rng.random() < 0.5 else Booking.STATUS_CONFIRMED
+                        created = cursor - timedelta(days=rng.randrange(1, 30))
+                        rows.append({
+                            'user_id': rng.choice(customer_ids), 'service_id': service_id,
+                            'staff_id': staff_id, 'start_time': cursor, 'end_time': end,
+                            'status': status, 'notes': '', 'created_at': created, 'updated_at': created,
+                        })
+                        cursor = end
+                    else:
+                        cursor += timedelta(minutes=30)
+        if len(rows) >= CHUNK:
+            conn.execute(insert(Booking.__table__), rows)
+            total += len(rows)
+            rows = []
+        day += timedelta(days=1)
+    if rows:
+        conn.execute(insert(Booking.__table__), rows)
+        total += len(rows)
+
+    refdata.bump_version()
+    db.session.commit()
+    stats.rebuild()
+    return {'users': users, 'staff': staff, 'services': services, 'years': years, 'bookings': total}
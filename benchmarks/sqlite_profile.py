@@ -0,0 +1,121 @@
+"""
+Throughput of the SQLite 'default' vs 'production' PRAGMA profiles.
+
+Each profile gets a fresh database with a few thousand bookings. Several
+worker processes then drive the app through the Flask test client for a
+fixed time, in a read-heavy mix (95% reads) and a mixed one (50% booking
+POSTs), and the requests/sec, error count and latency percentiles are
+printed as JSON:
+
+    python benchmarks/sqlite_profile.py --workers 4 --seconds 5
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import make_config, temp_db, latency_summary
+
+WORKLOADS = {'read_heavy': 0.05, 'mixed': 0.5}   # share of booking POSTs
+
+
+def _setup(db_path, profile, workers, bookings):
+    from app import create_app
+    from app.models import db, User, Service, Staff, Booking
+
+    app = create_app(make_config(db_path, SQLITE_PROFILE=profile))
+    with app.app_context():
+        for i in range(workers):
+            user = User(name=f'User {i}', email=f'user{i}@example.com', is_admin=True)
+            user.set_password('bench')
+            db.session.add(user)
+        db.session.add_all([Service(name=f'Service {i}', duration_minutes=30, price=10.0) for i in range(5)])
+        db.session.add_all([Staff(name=f'Staff {i}', email=f'staff{i}@example.com') for i in range(10)])
+        db.session.flush()
+        base = datetime(2020, 1, 6, 9, 0)
+        db.session.add_all([
+            Booking(user_id=1 + i % workers, service_id=1 + i % 5, staff_id=1 + i % 10,
+                    start_time=base + timedelta(minutes=30 * i),
+                    end_time=base + timedelta(minutes=30 * i + 30), status=Booking.STATUS_CONFIRMED)
+            for i in range(bookings)
+        ])
+        db.session.commit()
+
+
+def _worker(db_path, profile, index, seconds, write_share, out):
+    from app import create_app
+
+    app = create_app(make_config(db_path, SQLITE_PROFILE=profile))
+    client = app.test_client()
+    client.post('/auth/login', data={'email': f'user{index}@example.com', 'password': 'bench'})
+    rng = random.Random(index)
+    first_day = datetime.utcnow().date() + timedelta(days=1)
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        if rng.random() < write_share:
+            day = first_day + timedelta(days=rng.randrange(300))
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+            start = datetime.combine(day, datetime.min.time()) + timedelta(hours=9, minutes=15 * rng.randrange(28))
+            resp = client.post('/booking/book', data={
+                'service_id': 1 + rng.randrange(5),
+                'staff_id': 1 + rng.randrange(10),
+                'start_time': start.strftime('%Y-%m-%dT%H:%M'),
+            })
+        elif rng.random() < 0.5:
+            resp = client.get('/booking/calendar/events')
+        else:
+            resp = client.get('/admin/calendar/events?start=2020-01-01&end=2020-03-01')
+        latencies.append(time.perf_counter() - t0)
+        if resp.status_code >= 500:
+            errors += 1
+    out.put((latencies, errors))
+
+
+def run(profile, workload, workers, seconds, bookings):
+    with temp_db() as db_path:
+        _setup(db_path, profile, workers, bookings)
+        out = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=_worker, args=(db_path, profile, i, seconds, WORKLOADS[workload], out))
+            for i in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        collected = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    latencies = [lat for lats, _ in collected for lat in lats]
+    return {
+        'profile': profile,
+        'workload': workload,
+        'requests': len(latencies),
+        'errors': sum(err for _, err in collected),
+        'rps': round(len(latencies) / seconds, 1),
+        'latency_ms': latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--bookings', type=int, default=5000)
+    args = parser.parse_args()
+
+    results = [
+        run(profile, workload, args.workers, args.seconds, args.bookings)
+        for workload in WORKLOADS
+        for profile in ('default', 'production')
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
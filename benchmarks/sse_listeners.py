@@ -0,0 +1,212 @@
+"""
+Load test for the live admin calendar stream.
+
+Serves the app, opens ``--listeners`` concurrent SSE connections to
+/admin/calendar/stream as an admin, then admits ``--bookings`` bookings
+through app.admission and measures how long each one takes to reach every
+accepted listener. Meanwhile the public index page is fetched once per
+booking, to show whether open streams starve the rest of the site.
+
+``--server gunicorn`` (the default) runs gunicorn.conf.py with
+``--workers`` x ``--threads``, so streams past each worker's
+LIVE_MAX_LISTENERS are refused with 503. ``--server werkzeug`` uses
+werkzeug's thread-per-connection server, which has no thread limit to run
+out of. Prints accepted/refused counts, delivery latency and index latency
+as JSON:
+
+    python benchmarks/sse_listeners.py --listeners 40 --bookings 50
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from common import make_config, temp_db, latency_summary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WINDOW_START = datetime(2030, 1, 7, 9, 0)
+
+
+def _seed(db):
+    from app.models import User, Service, Staff
+
+    admin = User(name='Admin', email='admin@example.com', is_admin=True)
+    admin.set_password('bench')
+    db.session.add_all([
+        admin,
+        Service(name='Bench Service', duration_minutes=30, price=1.0),
+        Staff(name='Bench Staff', email='staff@example.com'),
+    ])
+    db.session.commit()
+
+
+def _listen(port, cookie, written, latencies, statuses, expected, ready, lock):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', '/admin/calendar/stream', headers={'Cookie': f'session={cookie}'})
+        resp = conn.getresponse()
+        status = resp.status
+    except OSError:
+        status = None             # no thread answered within the timeout
+    with lock:
+        statuses.append(status)
+    ready.release()
+    if status != 200:
+        conn.close()
+        return
+    seen = 0
+    while seen < expected:
+        line = resp.fp.readline()
+        if not line:
+            break
+        if line.startswith(b'data: '):
+            received = time.perf_counter()
+            start = json.loads(line[6:])['start']
+            with lock:
+                latencies.append(received - written[start])
+            seen += 1
+    conn.close()
+
+
+def _probe_index(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    started = time.perf_counter()
+    try:
+        conn.request('GET', '/')
+        resp = conn.getresponse()
+        resp.read()
+        ok = resp.status == 200
+    except OSError:
+        ok = False
+    finally:
+        conn.close()
+    return time.perf_counter() - started, ok
+
+
+def _start_gunicorn(db_path, args, secret_key):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path, SECRET_KEY=secret_key,
+               WEB_CONCURRENCY=str(args.workers), GUNICORN_THREADS=str(args.threads),
+               GUNICORN_BIND=f'127.0.0.1:{port}', LIVE_POLL_SECONDS=str(args.poll),
+               LIVE_STREAM_SECONDS='600')
+    if args.max_listeners is not None:
+        env['LIVE_MAX_LISTENERS'] = str(args.max_listeners)
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server', choices=['gunicorn', 'werkzeug'], default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (docker-compose default)')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--max-listeners', type=int, help='LIVE_MAX_LISTENERS (default: gunicorn.conf.py)')
+    parser.add_argument('--listeners', type=int, default=40)
+    parser.add_argument('--bookings', type=int, default=50)
+    parser.add_argument('--interval', type=float, default=0.05, help='seconds between bookings')
+    parser.add_argument('--poll', type=float, default=0.25, help='LIVE_POLL_SECONDS')
+    args = parser.parse_args()
+
+    from werkzeug.serving import make_server
+
+    from app import create_app
+    from app.admission import admit
+    from app.models import db, Booking
+
+    with temp_db() as db_path:
+        app = create_app(make_config(db_path, LIVE_POLL_SECONDS=args.poll, LIVE_STREAM_SECONDS=600))
+        with app.app_context():
+            _seed(db)
+        client = app.test_client()
+        client.post('/auth/login', data={'email': 'admin@example.com', 'password': 'bench'})
+        cookie = client.get_cookie('session').value
+
+        if args.server == 'gunicorn':
+            proc, port = _start_gunicorn(db_path, args, app.config['SECRET_KEY'])
+        else:
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            port = server.port
+
+        try:
+            written, latencies, statuses, lock = {}, [], [], threading.Lock()
+            ready = threading.Semaphore(0)
+            listeners = [
+                threading.Thread(target=_listen, daemon=True,
+                                 args=(port, cookie, written, latencies, statuses, args.bookings, ready, lock))
+                for _ in range(args.listeners)
+            ]
+            t0 = time.perf_counter()
+            for thread in listeners:
+                thread.start()
+            for _ in listeners:
+                ready.acquire()
+            connect_time = time.perf_counter() - t0
+
+            index_latencies, index_failures = [], 0
+            with app.app_context():
+                for i in range(args.bookings):
+                    start = WINDOW_START + timedelta(minutes=30 * i)
+                    booking = Booking(user_id=1, service_id=1, staff_id=1, start_time=start,
+                                      end_time=start + timedelta(minutes=30), status=Booking.STATUS_PENDING)
+                    written[start.isoformat()] = time.perf_counter()
+                    admit(booking)
+                    elapsed, ok = _probe_index(port)
+                    index_latencies.append(elapsed)
+                    index_failures += not ok
+                    time.sleep(args.interval)
+
+            for thread in listeners:
+                thread.join(timeout=30)
+        finally:
+            if args.server == 'gunicorn':
+                proc.terminate()
+                try:
+                    proc.wait(5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+            else:
+                server.shutdown()
+
+    accepted = statuses.count(200)
+    print(json.dumps({
+        'server': args.server,
+        'workers': args.workers if args.server == 'gunicorn' else None,
+        'threads': args.threads if args.server == 'gunicorn' else None,
+        'listeners': args.listeners,
+        'accepted': accepted,
+        'refused_503': statuses.count(503),
+        'timed_out': statuses.count(None),
+        'bookings': args.bookings,
+        'poll_seconds': args.poll,
+        'connect_all_ms': round(connect_time * 1000, 1),
+        'deliveries': len(latencies),
+        'expected_deliveries': accepted * args.bookings,
+        'delivery_latency_ms': latency_summary(latencies),
+        'index_failures': index_failures,
+        'index_latency_ms': latency_summary(index_latencies),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Benchmark suite: every blueprint's hot endpoints against a synthetic shop.
+
+Builds a shop with benchmarks/shop.py, then drives main.index,
+booking.calendar_events, admin.dashboard, admin.bookings,
+admin.calendar_events and booking.book (POST, last because it writes).
+Each scenario runs for ``--requests`` requests. With ``--driver client`` the
+requests go through the Flask test client, one at a time. With
+``--driver gunicorn`` they go to gunicorn.conf.py on a local port, from
+``--concurrency`` keep-alive clients. Query counts always come from an
+in-process test-client pass with METRICS_ENABLED (app/metrics.py), which
+runs first for gunicorn.
+
+Prints JSON with the commit, shop size, and for each endpoint: throughput,
+latency percentiles, errors and SQL statements per request. Pass an
+earlier run as ``--baseline`` to add ratios against it:
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --baseline before.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from common import make_config, temp_db, latency_summary
+from shop import ADMIN_EMAIL, PASSWORD, build_shop
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ['main.index', 'booking.calendar_events', 'admin.dashboard', 'admin.bookings',
+             'admin.calendar_events', 'booking.book']
+CUSTOMER_EMAIL = 'customer0@example.com'
+
+
+def _requests(scenario, rng, shop, today):
+    """Yield (method, path, form, role) for ``scenario`` forever; role picks the session."""
+    def week(back_days):
+        start = today - timedelta(days=rng.randrange(back_days)) if back_days else today
+        return urlencode({'start': start.date().isoformat(),
+                          'end': (start + timedelta(days=7)).date().isoformat()})
+
+    while True:
+        if scenario == 'main.index':
+            yield 'GET', '/', None, None
+        elif scenario == 'booking.calendar_events':
+            yield 'GET', f'/booking/calendar/events?{week(90)}', None, 'customer'
+        elif scenario == 'admin.dashboard':
+            yield 'GET', '/admin/', None, 'admin'
+        elif scenario == 'admin.bookings':
+            day = today - timedelta(days=rng.randrange(365 * shop['years']))
+            yield 'GET', rng.choice(['/admin/bookings', '/admin/bookings?status=pending',
+                                     f'/admin/bookings?date={day.date().isoformat()}']), None, 'admin'
+        elif scenario == 'admin.calendar_events':
+            yield 'GET', f'/admin/calendar/events?{week(365 * shop["years"])}', None, 'admin'
+        else:
+            start = today + timedelta(days=1 + rng.randrange(60), hours=9 + rng.randrange(8),
+                                      minutes=15 * rng.randrange(4))
+            form = {'service_id': 1 + rng.randrange(shop['services']),
+                    'staff_id': 1 + rng.randrange(shop['staff']),
+                    'start_time': start.strftime('%Y-%m-%dT%H:%M')}
+            yield 'POST', '/booking/book', form, 'customer'
+
+
+# ── Test-client driver ───────────────────────────────────────────────────────
+
+def _client_pass(app, shop, today, n, warmup, seed):
+    from app import metrics
+
+    clients = {None: app.test_client(), 'customer': app.test_client(), 'admin': app.test_client()}
+    clients['customer'].post('/auth/login', data={'email': CUSTOMER_EMAIL, 'password': PASSWORD})
+    clients['admin'].post('/auth/login', data={'email': ADMIN_EMAIL, 'password': PASSWORD})
+
+    results = {}
+    for scenario in SCENARIOS:
+        rng = random.Random(seed)
+        requests = _requests(scenario, rng, shop, today)
+        for _ in range(warmup):
+            method, path, form, role = next(requests)
+            clients[role].open(path, method=method, data=form)
+        latencies, errors = [], 0
+        t0 = time.perf_counter()
+        for _ in range(n):
+            method, path, form, role = next(requests)
+            started = time.perf_counter()
+            status = clients[role].open(path, method=method, data=form).status_code
+            latencies.append(time.perf_counter() - started)
+            errors += status >= 400
+        elapsed = time.perf_counter() - t0
+        results[scenario] = {'requests': n, 'errors': errors, 'rps': round(n / elapsed, 1),
+                             'latency_ms': latency_summary(latencies)}
+
+    with app.app_context():
+        by_endpoint = {row['endpoint']: row for row in metrics.registry().snapshot()}
+    for scenario, result in results.items():
+        row = by_endpoint.get(scenario, {})
+        result['queries_mean'] = row.get('mean_queries')
+        result['queries_max'] = row.get('max_queries')
+        result['sql_ms_mean'] = row.get('mean_sql_ms')
+    return results
+
+
+# ── Gunicorn driver ──────────────────────────────────────────────────────────
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _start_gunicorn(db_path, port, workers, threads):
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path, SECRET_KEY='bench',
+               WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+               GUNICORN_BIND=f'127.0.0.1:{port}', LOGIN_IP_LIMIT='1000000')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+def _login(port, email):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/auth/login', body=urlencode({'email': email, 'password': PASSWORD}),
+                  headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.getheader('Set-Cookie', '').split(';', 1)[0]
+
+
+def _http_client(port, requests, cookies, quota, latencies, errors, lock):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    mine, failed = [], 0
+    while True:
+        with lock:
+            if quota[0] <= 0:
+                break
+            quota[0] -= 1
+            method, path, form, role = next(requests)
+        headers = {'Cookie': cookies[role]} if role else {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            failed += response.status >= 400
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine.append(time.perf_counter() - started)
+    conn.close()
+    with lock:
+        latencies.extend(mine)
+        errors[0] += failed
+
+
+def _gunicorn_pass(db_path, shop, today, n, args):
+    port = _free_port()
+    proc = _start_gunicorn(db_path, port, args.workers, args.threads)
+    results = {}
+    try:
+        cookies = {'customer': _login(port, CUSTOMER_EMAIL), 'admin': _login(port, ADMIN_EMAIL)}
+        for scenario in SCENARIOS:
+            requests = _requests(scenario, random.Random(args.seed), shop, today)
+            quota, latencies, errors, lock = [n], [], [0], threading.Lock()
+            threads = [threading.Thread(target=_http_client,
+                                        args=(port, requests, cookies, quota, latencies, errors, lock))
+                       for _ in range(args.concurrency)]
+            t0 = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - t0
+            results[scenario] = {'requests': n, 'errors': errors[0], 'rps': round(n / elapsed, 1),
+                                 'latency_ms': latency_summary(latencies)}
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return results
+
+
+# ── Report ───────────────────────────────────────────────────────────────────
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(report, baseline):
+    """Current/baseline ratios: rps above 1 and p95 below 1 are improvements."""
+    delta = {}
+    for scenario, now in report['endpoints'].items():
+        then = baseline.get('endpoints', {}).get(scenario)
+        if not then:
+            continue
+        delta[scenario] = {
+            'rps_ratio': round(now['rps'] / then['rps'], 2) if then['rps'] else None,
+            'p95_ratio': (round(now['latency_ms']['p95'] / then['latency_ms']['p95'], 2)
+                          if then['latency_ms']['p95'] else None),
+            'queries_delta': (round(now['queries_mean'] - then['queries_mean'], 1)
+                              if now.get('queries_mean') is not None
+                              and then.get('queries_mean') is not None else None),
+        }
+    comparison = {'commit': baseline.get('commit'), 'endpoints': delta}
+    if baseline.get('driver') != report['driver']:
+        comparison['warning'] = f"baseline used --driver {baseline.get('driver')}; ratios are not comparable"
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--staff', type=int, default=6)
+    parser.add_argument('--services', type=int, default=7)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--fill', type=float, default=0.6, help='share of open slots booked')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=300, help='requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--driver', choices=['client', 'gunicorn'], default='client')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--baseline', help='earlier JSON report to compare against')
+    parser.add_argument('--output', help='also write the JSON report here')
+    args = parser.parse_args()
+
+    from app import create_app
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    report = {'commit': _commit(), 'driver': args.driver, 'python': sys.version.split()[0]}
+    with temp_db() as db_path:
+        app = create_app(make_config(db_path, METRICS_ENABLED=True, LOGIN_IP_LIMIT=10 ** 6))
+        with app.app_context():
+            t0 = time.perf_counter()
+            shop = build_shop(args.users, args.staff, args.services, args.years, args.fill, args.seed, today)
+            shop['build_s'] = round(time.perf_counter() - t0, 1)
+        report['shop'] = shop
+
+        # Query counts always come from the in-process client pass; with
+        # --driver gunicorn it runs first, and gunicorn then serves the same
+        # database (both only add bookings through booking.book)
+        counted = _client_pass(app, shop, today, args.requests if args.driver == 'client' else 50,
+                               args.warmup, args.seed)
+        if args.driver == 'client':
+            report['endpoints'] = counted
+        else:
+            served = _gunicorn_pass(db_path, shop, today, args.requests, args)
+            for scenario, result in served.items():
+                result.update({k: v for k, v in counted[scenario].items() if k.startswith(('queries', 'sql'))})
+            report['endpoints'] = served
+            report.update(concurrency=args.concurrency, workers=args.workers, threads=args.threads)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['vs_baseline'] = _compare(report, json.load(f))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Gunicorn worker spawn time and memory: per-worker import vs. lazy admin vs. preload.
+
+Starts gunicorn.conf.py with ``--workers`` workers in each mode. The config
+is wrapped to timestamp every worker between ``post_fork`` and
+``post_worker_init``, which covers importing and building the app when it
+is not preloaded. Then ``--respawns`` workers are killed one at a time to
+time replacements (what max_requests recycling costs), and the memory of
+each worker is read from /proc (PSS counts shared pages split across the
+processes that map them). Prints JSON:
+
+    python benchmarks/worker_spawn.py --workers 4 --respawns 4
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import temp_db, latency_summary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    'per-worker': {'GUNICORN_PRELOAD': '0', 'LAZY_ADMIN': '0'},
+    'lazy-admin': {'GUNICORN_PRELOAD': '0', 'LAZY_ADMIN': '1'},
+    'preload': {'GUNICORN_PRELOAD': '1', 'LAZY_ADMIN': '0'},
+}
+
+WRAPPER = '''
+import os, time
+exec(open({conf!r}).read())
+_post_fork = post_fork
+
+def post_fork(server, worker):
+    worker._bench_forked = time.perf_counter()
+    _post_fork(server, worker)
+
+def post_worker_init(worker):
+    with open({log!r}, 'a') as f:
+        f.write('%d %f\\n' % (os.getpid(), time.perf_counter() - worker._bench_forked))
+'''
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _spawn_log(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {int(pid): float(seconds) for pid, seconds in (line.split() for line in f)}
+
+
+def _wait_for(path, count, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        spawned = _spawn_log(path)
+        if len(spawned) >= count:
+            return spawned
+        time.sleep(0.05)
+    raise RuntimeError('workers did not start')
+
+
+def _memory_kb(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Dirty:'):
+                fields[parts[0][:-1]] = int(parts[1])
+    return fields
+
+
+def _run(mode, db_path, workers, respawns):
+    workdir = tempfile.mkdtemp()
+    log = os.path.join(workdir, 'spawn.log')
+    conf = os.path.join(workdir, 'gunicorn.conf.py')
+    with open(conf, 'w') as f:
+        f.write(WRAPPER.format(conf=os.path.join(ROOT, 'gunicorn.conf.py'), log=log))
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path, SECRET_KEY='bench',
+               WEB_CONCURRENCY=str(workers), GUNICORN_BIND=f'127.0.0.1:{_free_port()}',
+               **MODES[mode])
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', conf, 'run:app'], cwd=ROOT,
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        spawned = _wait_for(log, workers)
+        all_ready = time.perf_counter() - t0
+        time.sleep(1)
+        memory = [_memory_kb(pid) for pid in spawned]
+
+        for i in range(respawns):
+            victim = sorted(_spawn_log(log))[i]
+            os.kill(victim, signal.SIGKILL)
+            _wait_for(log, workers + i + 1)
+        replacement = list(_spawn_log(log).values())[workers:]
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+    return {
+        'all_workers_ready_ms': round(all_ready * 1000, 1),
+        'spawn_ms': latency_summary(list(spawned.values())),
+        'respawn_ms': latency_summary(replacement),
+        'worker_rss_kb': round(sum(m['Rss'] for m in memory) / len(memory)),
+        'worker_pss_kb': round(sum(m['Pss'] for m in memory) / len(memory)),
+        'worker_private_dirty_kb': round(sum(m['Private_Dirty'] for m in memory) / len(memory)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--respawns', type=int, default=4)
+    parser.add_argument('--modes', default=','.join(MODES))
+    args = parser.parse_args()
+
+    from app import create_app
+    from common import make_config
+
+    report = {'workers': args.workers, 'respawns': args.respawns, 'modes': {}}
+    with temp_db() as db_path:
+        create_app(make_config(db_path))   # migrate once up front
+        for mode in args.modes.split(','):
+            report['modes'][mode] = _run(mode, db_path, args.workers, args.respawns)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
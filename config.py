@@ -6,4 +6,71 @@ class Config:
     # Flask-SQLAlchemy expects SQLALCHEMY_DATABASE_URI
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool per worker process. gunicorn.conf.py sets the size to
+    # its thread count; the overflow covers streamed responses still holding
+    # a connection while the next request starts.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 2))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 2))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+
+    # PRAGMAs applied to every new SQLite connection, selected by SQLITE_PROFILE
+    SQLITE_PROFILES = {
+        'default': {},
+        'production': {
+            'journal_mode': 'WAL',          # readers no longer block behind writers
+            'synchronous': 'NORMAL',        # fsync at checkpoints only; safe with WAL
+            'busy_timeout': 5000,           # ms to wait for a lock before "database is locked"
+            'cache_size': -20000,           # ~20 MB page cache per connection
+            'mmap_size': 134217728,         # 128 MB memory-mapped reads
+            'temp_store': 'MEMORY',
+        },
+    }
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+    # Apply pending schema migrations in create_app(); gunicorn.conf.py turns
+    # this off for workers after migrating once in the master (app/migrations.py)
+    MIGRATE_ON_START = os.environ.get('MIGRATE_ON_START', '1') == '1'
+    # Import the admin views on the first admin request instead of at startup
+    # (see app/admin/__init__.py); leave off when gunicorn preloads the app
+    LAZY_ADMIN = os.environ.get('LAZY_ADMIN', '0') == '1'
     WTF_CSRF_ENABLED = True
+    # Granularity of the slot grid offered by /booking/availability
+    BOOKING_SLOT_MINUTES = int(os.environ.get('BOOKING_SLOT_MINUTES', 15))
+    # Rows per page on the admin bookings list and My Bookings
+    BOOKINGS_PER_PAGE = int(os.environ.get('BOOKINGS_PER_PAGE', 50))
+    # How long a booking waits for another thread of its worker to finish
+    # writing before it is answered "busy, try again" (see app/admission.py)
+    ADMISSION_LOCK_WAIT_SECONDS = float(os.environ.get('ADMISSION_LOCK_WAIT_SECONDS', 2))
+    # Max rendered public pages kept per worker (see app/pagecache.py)
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 128))
+    # Live admin calendar (see app/live.py): change-log poll interval, max
+    # length of one SSE connection before the browser reconnects, open
+    # streams per worker (each holds a thread; gunicorn.conf.py sets a
+    # quarter of its threads), and how long change rows are kept for
+    # reconnect replay
+    LIVE_POLL_SECONDS = float(os.environ.get('LIVE_POLL_SECONDS', 1))
+    LIVE_STREAM_SECONDS = int(os.environ.get('LIVE_STREAM_SECONDS', 300))
+    LIVE_MAX_LISTENERS = int(os.environ.get('LIVE_MAX_LISTENERS', 2))
+    LIVE_RETENTION_HOURS = int(os.environ.get('LIVE_RETENTION_HOURS', 24))
+    # Confirmed/cancelled bookings that ended this many days ago move to
+    # bookings_archive (see app/archive.py), this many rows per transaction
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 1000))
+    # Password hashing (see app/passwords.py): werkzeug method string, hash
+    # pool size per worker, how many logins may wait for it, and for how long
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))
+    PASSWORD_HASH_WAIT_SECONDS = float(os.environ.get('PASSWORD_HASH_WAIT_SECONDS', 5))
+    # Login throttling (see app/throttle.py): attempts per client IP and
+    # failed attempts per email, per window
+    LOGIN_IP_LIMIT = int(os.environ.get('LOGIN_IP_LIMIT', 30))
+    LOGIN_EMAIL_LIMIT = int(os.environ.get('LOGIN_EMAIL_LIMIT', 5))
+    LOGIN_WINDOW_SECONDS = int(os.environ.get('LOGIN_WINDOW_SECONDS', 300))
+    # Request/SQL instrumentation (see app/metrics.py): off by default; slow
+    # statements are logged, the slowest few kept per endpoint. Set a token to
+    # let a Prometheus scraper read /admin/metrics/prometheus without a login.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+    METRICS_SLOW_QUERY_MS = float(os.environ.get('METRICS_SLOW_QUERY_MS', 100))
+    METRICS_SLOWEST = int(os.environ.get('METRICS_SLOWEST', 5))
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
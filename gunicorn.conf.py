@@ -0,0 +1,94 @@
+"""
+Gunicorn settings for production.
+
+Workers use the threaded ``gthread`` class. A request blocked on a slow
+SQLite write, a slow client or an open SSE stream (/admin/calendar/stream)
+ties up one thread rather than a whole process. Each thread works inside
+its own app context, so it gets its own Flask-SQLAlchemy session. The
+connection pool is sized to the thread count so threads don't queue for
+connections. SQLite lock waits are handled by the ``production``
+SQLITE_PROFILE (WAL plus busy_timeout), and booking admission takes
+the write lock up front (app/admission.py).
+
+The master imports the app once (``preload_app``) and workers fork from
+it. They skip Flask/SQLAlchemy imports and app setup, and share those pages
+copy-on-write. Schema migrations run once in the master before any worker
+forks, so workers boot without touching the schema. Each worker drops the
+inherited connection pool right after the fork (``post_fork``). Set
+GUNICORN_PRELOAD=0 to make every worker import the app itself, e.g. with
+``--reload``.
+
+Override any value with the matching environment variable:
+
+    WEB_CONCURRENCY=3 GUNICORN_THREADS=16 gunicorn -c gunicorn.conf.py run:app
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# SQLite has a single writer, so extra processes mostly add contention;
+# concurrency comes from threads instead.
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() + 1, 4)))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# One pooled connection per thread, plus headroom for the live-update watcher
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+os.environ.setdefault('DB_MAX_OVERFLOW', '2')
+# Open live-calendar streams each hold a thread; keep most for the rest of the site
+os.environ.setdefault('LIVE_MAX_LISTENERS', str(max(1, threads // 4)))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = 2000
+max_requests_jitter = 200
+
+# Heartbeat files on tmpfs; the container's overlay filesystem can stall them
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Apply pending schema migrations once, before any worker forks."""
+    from app.models import db
+
+    if server.cfg.preload_app:
+        # create_app() already migrated while preloading run:app
+        from app.migrations import current_version
+
+        with server.app.wsgi().app_context():
+            version = current_version()
+            db.engine.dispose()       # fork with no open SQLite handles
+        gc.freeze()                   # keep GC from dirtying shared pages in workers
+        server.log.info('Schema at version %d (migrated while preloading)', version)
+        return
+
+    os.environ['MIGRATE_ON_START'] = '0'
+    from config import Config
+    Config.MIGRATE_ON_START = False   # workers fork with this module already imported
+
+    from app import create_app
+    from app.migrations import LATEST, upgrade
+
+    with create_app().app_context():
+        applied = upgrade()
+        db.engine.dispose()           # no SQLite handles shared across the fork
+    server.log.info('Schema at version %d (%d step(s) applied)', LATEST, len(applied))
+
+
+def post_fork(server, worker):
+    """Give each preloaded worker its own connection pool."""
+    if server.cfg.preload_app:
+        from app.models import db
+
+        with server.app.wsgi().app_context():
+            db.engine.dispose(close=False)   # leave the parent's connections alone
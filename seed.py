@@ -6,7 +6,50 @@ Run once after first deploy (or to reset to car-shop defaults):
 from datetime import time
 
 from app import create_app
-from app.models import db, User, Service, Staff, BusinessHours, Booking, AppSetting
+from app import changes, refdata, stats
+from app.models import (db, User, Service, Staff, BusinessHours, Booking, BookingArchive,
+                        BookingChange, BookingSeries, AppSetting)
+
+
+# ── Car-shop defaults (also shape the synthetic shop in benchmarks/shop.py) ──
+
+SERVICES = [
+    ('Oil Change',              'Full synthetic oil change with filter replacement.',          30,  45.00),
+    ('Tire Rotation & Balance', 'Rotate and balance all four tires.',                         30,  30.00),
+    ('Brake Inspection',        'Inspect and service brake pads, rotors, and fluid.',         60,  80.00),
+    ('Full Detail & Wash',      'Interior and exterior deep clean and polish.',               90, 120.00),
+    ('Engine Diagnostics',      'Computer scan and full engine health check.',                45,  60.00),
+    ('AC Service & Recharge',   'Recharge refrigerant and inspect AC system components.',    60,  95.00),
+    ('Battery Test & Replace',  'Test battery health and replace if needed.',                20,  35.00),
+]
+
+STAFF = [
+    ('Mike Torres',   'mike@autobook.com',  'Engine & Diagnostics'),
+    ('Sara Al-Rashid','sara@autobook.com',  'Brakes & Tires'),
+    ('James Kowalski','james@autobook.com', 'Detailing & AC'),
+]
+
+# (day_of_week, open, close, closed) per schedule type
+SCHEDULES = {
+    'regular': [
+        (0, time(8, 0), time(18, 0), False),
+        (1, time(8, 0), time(18, 0), False),
+        (2, time(8, 0), time(18, 0), False),
+        (3, time(8, 0), time(18, 0), False),
+        (4, time(8, 0), time(18, 0), False),
+        (5, time(9, 0), time(17, 0), False),
+        (6, None,       None,        True),   # Sunday closed
+    ],
+    'ramadan': [
+        (0, time(9, 0), time(15, 0), False),
+        (1, time(9, 0), time(15, 0), False),
+        (2, time(9, 0), time(15, 0), False),
+        (3, time(9, 0), time(15, 0), False),
+        (4, time(9, 0), time(15, 0), False),
+        (5, time(9, 0), time(13, 0), False),
+        (6, None,       None,        True),   # Sunday closed
+    ],
+}
 
 
 def seed():
@@ -20,60 +63,28 @@ def seed():
             print('Created admin user: admin@shop.com / admin123')
 
         # ── Reset services, staff, and bookings ───────────────────────────────
-        # Delete in FK-safe order: bookings → staff → services
-        deleted_bookings = Booking.query.delete()
+        # Delete in FK-safe order: bookings (live, archived, series, change log) → staff → services
+        deleted_bookings = Booking.query.delete() + BookingArchive.query.delete()
+        BookingSeries.query.delete()
+        BookingChange.query.delete()
         deleted_staff    = Staff.query.delete()
         deleted_services = Service.query.delete()
         db.session.flush()
         print(f'Cleared {deleted_bookings} booking(s), {deleted_staff} staff, {deleted_services} service(s)')
 
         # ── Services ──────────────────────────────────────────────────────────
-        services_data = [
-            ('Oil Change',              'Full synthetic oil change with filter replacement.',          30,  45.00),
-            ('Tire Rotation & Balance', 'Rotate and balance all four tires.',                         30,  30.00),
-            ('Brake Inspection',        'Inspect and service brake pads, rotors, and fluid.',         60,  80.00),
-            ('Full Detail & Wash',      'Interior and exterior deep clean and polish.',               90, 120.00),
-            ('Engine Diagnostics',      'Computer scan and full engine health check.',                45,  60.00),
-            ('AC Service & Recharge',   'Recharge refrigerant and inspect AC system components.',    60,  95.00),
-            ('Battery Test & Replace',  'Test battery health and replace if needed.',                20,  35.00),
-        ]
-        for name, desc, duration, price in services_data:
+        for name, desc, duration, price in SERVICES:
             db.session.add(Service(name=name, description=desc, duration_minutes=duration, price=price))
             print(f'Created service: {name}')
 
         # ── Staff ─────────────────────────────────────────────────────────────
-        staff_data = [
-            ('Mike Torres',   'mike@autobook.com',  'Engine & Diagnostics'),
-            ('Sara Al-Rashid','sara@autobook.com',  'Brakes & Tires'),
-            ('James Kowalski','james@autobook.com', 'Detailing & AC'),
-        ]
-        for name, email, specialty in staff_data:
+        for name, email, specialty in STAFF:
             db.session.add(Staff(name=name, email=email, specialty=specialty))
             print(f'Created staff: {name}')
 
         # ── Business hours ────────────────────────────────────────────────────
         day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        schedules = {
-            'regular': [
-                (0, time(8, 0), time(18, 0), False),
-                (1, time(8, 0), time(18, 0), False),
-                (2, time(8, 0), time(18, 0), False),
-                (3, time(8, 0), time(18, 0), False),
-                (4, time(8, 0), time(18, 0), False),
-                (5, time(9, 0), time(17, 0), False),
-                (6, None,       None,        True),   # Sunday closed
-            ],
-            'ramadan': [
-                (0, time(9, 0), time(15, 0), False),
-                (1, time(9, 0), time(15, 0), False),
-                (2, time(9, 0), time(15, 0), False),
-                (3, time(9, 0), time(15, 0), False),
-                (4, time(9, 0), time(15, 0), False),
-                (5, time(9, 0), time(13, 0), False),
-                (6, None,       None,        True),   # Sunday closed
-            ],
-        }
-        for stype, hours_data in schedules.items():
+        for stype, hours_data in SCHEDULES.items():
             for day, open_t, close_t, closed in hours_data:
                 bh = BusinessHours.query.filter_by(day_of_week=day, schedule_type=stype).first()
                 if bh is None:
@@ -90,7 +101,13 @@ def seed():
             db.session.add(AppSetting(key='active_schedule', value='regular'))
             print('Created setting: active_schedule = regular')
 
+        # ── Tell running workers to drop their cached services/staff/hours ────
+        # and calendars to refetch (the bookings they hold are gone)
+        refdata.bump_version()
+        AppSetting.increment(changes.VERSION_KEY)
+
         db.session.commit()
+        stats.rebuild()
         print('\nSeed complete.')
 
 
@@ -0,0 +1,37 @@
+"""
+Shared fixtures: an app on a scratch SQLite file, migrated and empty.
+
+No app context stays pushed across a test, so each test-client request gets
+its own ``g`` and session as it would in a worker; push one with
+``app.app_context()`` to touch the database directly.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+    from app.models import db
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    config = type('TestConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+    })
+    app = create_app(config)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
@@ -0,0 +1,38 @@
+"""Archiving keeps booking ids unique across ``bookings`` and ``bookings_archive``."""
+from datetime import datetime, timedelta
+
+from app.archive import archive_before
+from app.models import db, Booking, BookingArchive, Service, Staff, User
+
+START = datetime(2020, 1, 6, 9, 0)
+
+
+def _book(start):
+    customer, service, staff = User.query.one(), Service.query.one(), Staff.query.one()
+    booking = Booking(user_id=customer.id, service_id=service.id, staff_id=staff.id,
+                      start_time=start, end_time=start + timedelta(minutes=30),
+                      status=Booking.STATUS_CONFIRMED)
+    db.session.add(booking)
+    db.session.commit()
+    return booking.id
+
+
+def test_archived_ids_are_not_reused(app):
+    with app.app_context():
+        user = User(name='customer', email='customer@example.com')
+        user.set_password('archive-test')
+        db.session.add_all([user, Service(name='Oil Change', duration_minutes=30, price=45),
+                            Staff(name='Mike', email='mike@example.com')])
+        db.session.commit()
+
+        ids = [_book(START + timedelta(hours=i)) for i in range(3)]
+        assert archive_before(START + timedelta(days=1)) == 3
+        assert Booking.query.count() == 0
+
+        # The newest booking went to the archive; its id must not come back
+        new_id = _book(START + timedelta(days=2))
+        assert new_id > max(ids)
+
+        assert archive_before(START + timedelta(days=3)) == 1
+        archived = db.session.execute(db.select(BookingArchive.id).order_by(BookingArchive.id)).scalars().all()
+        assert archived == ids + [new_id]
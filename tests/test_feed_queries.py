@@ -0,0 +1,80 @@
+"""Calendar feeds issue a fixed number of SQL statements however many bookings they cover."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db, Booking, Service, Staff, User
+
+PASSWORD = 'feed-test'
+START = datetime(2026, 3, 2, 9, 0)
+WINDOW = 'start=2026-03-01T00:00:00&end=2026-04-01T00:00:00'
+
+
+@pytest.fixture
+def shop(app):
+    with app.app_context():
+        for name, is_admin in (('admin', True), ('customer', False)):
+            user = User(name=name, email=f'{name}@example.com', is_admin=is_admin)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.add_all([Service(name='Oil Change', duration_minutes=30, price=45),
+                            Staff(name='Mike', email='mike@example.com')])
+        db.session.commit()
+    return app
+
+
+def _add_bookings(app, count):
+    with app.app_context():
+        customer = User.query.filter_by(is_admin=False).one()
+        service, staff = Service.query.one(), Staff.query.one()
+        offset = Booking.query.count()
+        for i in range(offset, offset + count):
+            start = START + timedelta(hours=i)
+            db.session.add(Booking(user_id=customer.id, service_id=service.id, staff_id=staff.id,
+                                   start_time=start, end_time=start + timedelta(minutes=30),
+                                   status=Booking.STATUS_CONFIRMED))
+        db.session.commit()
+
+
+def _statements(app, client, url):
+    """Statements issued while serving ``url`` (streamed body included) and the event count."""
+    statements = []
+
+    def count(conn, cursor, statement, *_):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(url)
+        body = response.get_json()
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    events = body['events'] if isinstance(body, dict) else body
+    return len(statements), len(events)
+
+
+@pytest.mark.usefixtures('shop')
+@pytest.mark.parametrize('role, url', [
+    ('admin', '/admin/calendar/events?' + WINDOW),
+    ('admin', '/admin/calendar/events?fields=id,start,end&' + WINDOW),
+    ('admin', '/admin/calendar/events?since=2000-01-01T00:00:00&' + WINDOW),
+    ('customer', '/booking/calendar/events?' + WINDOW),
+    ('customer', '/booking/calendar/events?since=2000-01-01T00:00:00&' + WINDOW),
+])
+def test_feed_statement_count_is_flat(app, role, url):
+    client = app.test_client()
+    client.post('/auth/login', data={'email': f'{role}@example.com', 'password': PASSWORD})
+
+    _add_bookings(app, 3)
+    client.get(url)                     # warm the per-worker reference data
+    few, few_events = _statements(app, client, url)
+
+    _add_bookings(app, 40)
+    many, many_events = _statements(app, client, url)
+
+    assert (few_events, many_events) == (3, 43)
+    assert many == few
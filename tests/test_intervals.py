@@ -0,0 +1,70 @@
+"""StaffIntervals keeps busy time merged and treats intervals as half-open ``[start, end)``."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.intervals import StaffIntervals
+
+DAY = datetime(2026, 3, 2)
+
+
+def t(hhmm):
+    return DAY + timedelta(hours=hhmm // 100, minutes=hhmm % 100)
+
+
+def spans(intervals):
+    return [(start.hour * 100 + start.minute, end.hour * 100 + end.minute) for start, end in intervals]
+
+
+def test_constructor_merges_touching_and_overlapping():
+    ivs = StaffIntervals([(t(1000), t(1030)), (t(900), t(930)), (t(930), t(945)), (t(1015), t(1100))])
+    assert spans(ivs) == [(900, 945), (1000, 1100)]
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (800, 830, [(800, 830), (900, 1000), (1100, 1200)]),      # before everything
+    (1000, 1030, [(900, 1030), (1100, 1200)]),                # touches the end of one
+    (1030, 1100, [(900, 1000), (1030, 1200)]),                # touches the start of the next
+    (1000, 1100, [(900, 1200)]),                              # fills the gap exactly
+    (930, 1130, [(900, 1200)]),                               # overlaps both
+    (830, 1300, [(830, 1300)]),                               # covers both
+    (915, 945, [(900, 1000), (1100, 1200)]),                  # inside one
+    (1015, 1045, [(900, 1000), (1015, 1045), (1100, 1200)]),  # strictly inside the gap
+])
+def test_add_merges(start, end, expected):
+    ivs = StaffIntervals([(t(900), t(1000)), (t(1100), t(1200))])
+    ivs.add(t(start), t(end))
+    assert spans(ivs) == expected
+
+
+@pytest.mark.parametrize('start, end, busy', [
+    (800, 900, False),    # ends where a busy interval starts
+    (1000, 1100, False),  # starts where one ends and ends where the next starts
+    (1200, 1300, False),  # starts where the last one ends
+    (859, 901, True),
+    (959, 1001, True),
+    (1030, 1130, True),
+    (800, 1300, True),
+])
+def test_overlaps_is_half_open(start, end, busy):
+    ivs = StaffIntervals([(t(900), t(1000)), (t(1100), t(1200))])
+    assert ivs.overlaps(t(start), t(end)) is busy
+
+
+def test_overlaps_empty():
+    assert not StaffIntervals().overlaps(t(900), t(1000))
+
+
+@pytest.mark.parametrize('start, minutes, not_after, expected', [
+    (800, 60, None, 800),      # fits exactly before the first interval
+    (800, 61, None, 1200),     # one minute too long for either gap
+    (930, 60, None, 1000),     # starts inside a busy interval
+    (1000, 60, None, 1000),    # the gap is exactly long enough
+    (1000, 90, None, 1200),    # gap too short: after the last interval
+    (1000, 90, 1300, None),    # ...which is past not_after
+    (1000, 60, 1100, 1000),    # ending exactly at not_after is fine
+])
+def test_next_free(start, minutes, not_after, expected):
+    ivs = StaffIntervals([(t(900), t(1000)), (t(1100), t(1200))])
+    found = ivs.next_free(t(start), timedelta(minutes=minutes), None if not_after is None else t(not_after))
+    assert found == (None if expected is None else t(expected))
@@ -0,0 +1,53 @@
+"""Live stream replay pages through the change log, and dropped listeners end their stream."""
+from datetime import datetime, timedelta
+
+from app import live
+from app.changes import booking_changed
+from app.models import db, Booking, Service, Staff, User
+
+START = datetime(2026, 3, 2, 9, 0)
+
+
+def _broker(app):
+    return live.Broker(app, lambda r: {'id': r.id})
+
+
+def _add_bookings(app, count):
+    with app.app_context():
+        user = User(name='customer', email='customer@example.com')
+        user.set_password('live-test')
+        service = Service(name='Oil Change', duration_minutes=30, price=45)
+        staff = Staff(name='Mike', email='mike@example.com')
+        db.session.add_all([user, service, staff])
+        db.session.flush()
+        for i in range(count):
+            start = START + timedelta(hours=i)
+            booking = Booking(user_id=user.id, service_id=service.id, staff_id=staff.id,
+                              start_time=start, end_time=start + timedelta(minutes=30))
+            db.session.add(booking)
+            booking_changed(booking)
+        db.session.commit()
+
+
+def test_backlog_is_paged_not_truncated(app):
+    _add_bookings(app, 7)
+    broker = _broker(app)
+    replayed = list(broker.messages_after(0, limit=3))
+    assert [event['id'] for _, event in replayed] == list(range(1, 8))
+    assert [change_id for change_id, _ in replayed] == sorted(change_id for change_id, _ in replayed)
+    with app.app_context():
+        assert list(broker.messages_after(broker.latest_id())) == []
+
+
+def test_dropped_listener_ends_its_stream(app):
+    broker = _broker(app)
+    with app.app_context():
+        q = broker.subscribe()
+    body = live.stream(broker, q, (), duration=60)
+    assert next(body).startswith('retry:')
+
+    broker._publish([(i, {'id': i}) for i in range(live.LISTENER_QUEUE_SIZE + 1)])
+    assert q.closed.is_set()
+    assert broker.listener_count() == 0
+    # Ends at once, without draining the full queue first
+    assert list(body) == []
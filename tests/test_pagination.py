@@ -0,0 +1,101 @@
+"""Keyset pages walk bookings newest first by ``(start_time, id)``, across live and archived rows."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.archive import archive_before
+from app.models import db, Booking, Service, Staff, User
+from app.pagination import decode_cursor, encode_cursor, keyset_page
+from app.readmodels import booking_rows, to_rows
+
+START = datetime(2026, 3, 2, 9, 0)
+# Hour offsets in insertion (id) order; repeats share a start_time, so ties
+# must be broken by id. Pending bookings are never archived.
+HOURS = [3, 0, 2, 0, 4, 2, 0, 1, 4, 2]
+PENDING = {5}  # index into HOURS: one 2-hour tie stays live while the others move
+
+
+@pytest.fixture
+def bookings(app):
+    """Ids newest first, after archiving everything confirmed that ended before hour 3."""
+    with app.app_context():
+        user = User(name='customer', email='customer@example.com')
+        user.set_password('page-test')
+        service = Service(name='Oil Change', duration_minutes=30, price=45)
+        staff = Staff(name='Mike', email='mike@example.com')
+        db.session.add_all([user, service, staff])
+        db.session.flush()
+        keys = []
+        for i, hours in enumerate(HOURS):
+            start = START + timedelta(hours=hours)
+            booking = Booking(user_id=user.id, service_id=service.id, staff_id=staff.id,
+                              start_time=start, end_time=start + timedelta(minutes=30),
+                              status=Booking.STATUS_PENDING if i in PENDING else Booking.STATUS_CONFIRMED)
+            db.session.add(booking)
+            db.session.flush()
+            keys.append((start, booking.id))
+        db.session.commit()
+        assert archive_before(START + timedelta(hours=3)) == len([h for h in HOURS if h < 3]) - len(PENDING)
+    return [booking_id for _, booking_id in sorted(keys, reverse=True)]
+
+
+def _walk(app, per_page, include_archive=True):
+    """Follow ``after`` cursors to the end, then ``before`` cursors back; return both page lists."""
+    forward, backward = [], []
+    with app.app_context():
+        queries = booking_rows(include_archive)
+        page = keyset_page(queries, per_page=per_page)
+        forward.append([r.id for r in page.items])
+        assert page.prev_cursor is None
+        while page.next_cursor:
+            page = keyset_page(queries, after=page.next_cursor, per_page=per_page)
+            forward.append([r.id for r in page.items])
+        backward.append(forward[-1])
+        while page.prev_cursor:
+            page = keyset_page(queries, before=page.prev_cursor, per_page=per_page)
+            backward.append([r.id for r in page.items])
+    return forward, backward[::-1]
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 4, 20])
+def test_after_and_before_round_trip(app, bookings, per_page):
+    forward, backward = _walk(app, per_page)
+    assert [i for page in forward for i in page] == bookings
+    assert all(len(page) == per_page for page in forward[:-1])
+    assert backward == forward
+
+
+def test_ties_on_start_time_are_ordered_by_id(app, bookings):
+    with app.app_context():
+        queries = booking_rows(True)
+        first = keyset_page(queries, per_page=1)
+        rows = keyset_page(queries, after=first.next_cursor, per_page=len(HOURS)).items
+        rows = list(first.items) + list(rows)
+    assert [(r.start_time, r.id) for r in rows] == sorted(((r.start_time, r.id) for r in rows), reverse=True)
+    assert len({r.start_time for r in rows}) < len(rows)
+
+
+def test_live_and_archive_are_merged(app, bookings):
+    forward, _ = _walk(app, 3)
+    flags = {}
+    with app.app_context():
+        for row in to_rows(keyset_page(booking_rows(True), per_page=len(HOURS)).items):
+            flags[row.id] = row.is_archived
+    assert True in flags.values() and False in flags.values()
+    assert [i for page in forward for i in page] == bookings
+
+    live, _ = _walk(app, 3, include_archive=False)
+    assert [i for page in live for i in page] == [i for i in bookings if not flags[i]]
+
+
+@pytest.mark.parametrize('cursor', ['', 'not base64!', 'bm90IGEgY3Vyc29y', encode_cursor(
+    type('Row', (), {'start_time': START, 'id': 'x'})())])
+def test_garbled_cursor_is_the_first_page(app, bookings, cursor):
+    assert decode_cursor(cursor) is None
+    with app.app_context():
+        queries = booking_rows(True)
+        first = keyset_page(queries, per_page=3)
+        for kwargs in ({'after': cursor}, {'before': cursor}):
+            page = keyset_page(queries, per_page=3, **kwargs)
+            assert [r.id for r in page.items] == [r.id for r in first.items]
+            assert page.prev_cursor is None
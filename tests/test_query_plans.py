@@ -0,0 +1,10 @@
+"""The hot booking queries, as the app builds them, use an index and never sort their whole result."""
+from app.schema import explain_hot_queries, full_scans, full_sorts
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        plans = explain_hot_queries()
+    assert plans and all(plans.values())
+    assert full_scans(plans) == [], plans
+    assert full_sorts(plans) == [], plans